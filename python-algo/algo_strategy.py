@@ -3,7 +3,6 @@ import random
 import math
 import warnings
 from sys import maxsize
-import json
 
 
 """
@@ -15,8 +14,8 @@ Advanced strategy tips:
   - You can analyze action frames by modifying on_action_frame function
 
   - The GameState.map object can be manually manipulated to create hypothetical 
-  board states. Though, we recommended making a copy of the map to preserve 
-  the actual current map state.
+  board states. Though, we recommended working on a copy made with
+  GameState.fork() to preserve the actual current map state.
 """
 
 class AlgoStrategy(gamelib.AlgoCore):
@@ -183,9 +182,11 @@ class AlgoStrategy(gamelib.AlgoCore):
         estimate the path's damage risk.
         """
         damages = []
+        # Pathing from every spawn location at once shares most of the work between them
+        spawn_paths = game_state.find_paths_from_all_spawns(0)
         # Get the damage estimate each path will take
         for location in location_options:
-            path = game_state.find_path_to_edge(location)
+            path = spawn_paths[tuple(location)]
             damage = 0
             for path_location in path:
                 # Get number of enemy turrets that can attack each location and multiply by turret damage
@@ -196,18 +197,19 @@ class AlgoStrategy(gamelib.AlgoCore):
         return location_options[damages.index(min(damages))]
 
     def detect_enemy_unit(self, game_state, unit_type=None, valid_x = None, valid_y = None):
-        total_units = 0
-        for location in game_state.game_map:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type) and (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
-                        total_units += 1
-        return total_units
+        # Bitboards turn the search into a few integer operations instead of a loop over the map
+        enemy_units = game_state.game_map.get_bitboard(player_index=1, unit_type=unit_type)
+        if valid_x is not None:
+            enemy_units &= gamelib.bitboard.columns(valid_x)
+        if valid_y is not None:
+            enemy_units &= gamelib.bitboard.rows(valid_y)
+        return gamelib.bitboard.count(enemy_units)
         
     def filter_blocked_locations(self, locations, game_state):
+        blocked = game_state.game_map.get_bitboard()
         filtered = []
         for location in locations:
-            if not game_state.contains_stationary_unit(location):
+            if not gamelib.bitboard.contains(blocked, location):
                 filtered.append(location)
         return filtered
 
@@ -219,7 +221,8 @@ class AlgoStrategy(gamelib.AlgoCore):
         Full doc on format of a game frame at in json-docs.html in the root of the Starterkit.
         """
         # Let's record at what position we get scored on
-        state = json.loads(turn_string)
+        # AlgoCore has already decoded the frame, so this doesn't decode it again
+        state = gamelib.decode_message(turn_string)
         events = state["events"]
         breaches = events["breach"]
         for breach in breaches:
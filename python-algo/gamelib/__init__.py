@@ -16,14 +16,17 @@ Investigating it is useful for advanced players interested in getting data from
 The Navigation class in navigation.py contains functions related to pathfinding, which are used by GameState in pathing related functions. 
 Investigating it is useful for advanced player who want to optimize the slow default pathing algorithm we provide. \n 
 
-util.py contains a small handful of functions that help with communication, including the debug-printing function, debug_write().
+util.py contains a small handful of functions that help with communication, including the debug-printing function, debug_write(). \n
+
+bitboard.py contains functions for combining sets of locations stored as ints, such as the bitboards returned by GameMap.get_bitboard().
 """
 
 from .algocore import AlgoCore
-from .util import debug_write
+from .util import debug_write, decode_message, ParsedMessage
 from .game_state import GameState
 from .unit import GameUnit
 from .game_map import GameMap
+from . import bitboard
 
-__all__ = ["algocore", "game_state", "game_map", "navigation", "unit", "util"]
+__all__ = ["algocore", "bitboard", "game_state", "game_map", "navigation", "unit", "util"]
  
\ No newline at end of file
@@ -1,7 +1,6 @@
-import json
-
 from .game_state import GameState
-from .util import get_command, debug_write, BANNER_TEXT, send_command
+from .unit import compile_unit_specs
+from .util import get_command, debug_write, BANNER_TEXT, send_command, ParsedMessage, json_loads
 
 class AlgoCore(object):
     """
@@ -27,6 +26,7 @@ class AlgoCore(object):
         """
         This step function is called at the start of each turn.
         It is passed the current game state, which can be used to initiate a new GameState object. 
+        The game state is a ParsedMessage, a str that also holds its decoded json, so GameState does not decode it again.
         By default, it sends empty commands to the game engine. \n
         algo_strategy.py inherits from AlgoCore and overrides this on turn function. 
         Adjusting the on_turn function in algo_strategy is the main way to adjust your algo's logic. 
@@ -40,6 +40,7 @@ class AlgoCore(object):
         The action phase is made up of a sequence of distinct frames. 
         Each of these frames is sent to the algo in order. 
         They can be handled in this function. 
+        Each frame is a ParsedMessage, so use decode_message or its data attribute instead of json.loads.
         """
         pass
 
@@ -61,10 +62,14 @@ class AlgoCore(object):
                 """
                 This means this must be the config file. So, load in the config file as a json and add it to your AlgoStrategy class.
                 """
-                parsed_config = json.loads(game_state_string)
+                parsed_config = json_loads(game_state_string)
+                # Compiled here rather than in on_game_start, since strategies override it
+                compile_unit_specs(parsed_config)
                 self.on_game_start(parsed_config)
             elif "turnInfo" in game_state_string:
-                state = json.loads(game_state_string)
+                # Decode each message once, and pass the decoded json along with the string
+                game_state_string = ParsedMessage(game_state_string)
+                state = game_state_string.data
                 stateType = int(state.get("turnInfo")[0])
                 if stateType == 0:
                     """
@@ -0,0 +1,117 @@
+"""
+Bitboards are Python ints with one bit for each arena tile, so sets of locations can be combined
+with a couple of integer operations instead of loops over the game map.
+
+The bit of location [x, y] is x * ARENA_SIZE + y, and only bits of tiles inside the arena are ever set.
+Combine bitboards with the usual int operators: | for union, & for intersection, & ~ for difference.
+GameMap.get_bitboard returns the bitboard of the structures on the map.
+
+For example, the number of enemy turrets in rows 14 and 15 is::
+
+    count(game_map.get_bitboard(1, TURRET) & rows([14, 15]))
+
+"""
+from .game_map import ARENA_SIZE, ARENA_MASK, ARENA_LOCATIONS
+
+ARENA = 0
+for _x, _y in ARENA_LOCATIONS:
+    ARENA |= 1 << (_x * ARENA_SIZE + _y)
+
+ROW_MASKS = tuple(sum(1 << (x * ARENA_SIZE + y) for x in range(ARENA_SIZE) if ARENA_MASK[x][y]) for y in range(ARENA_SIZE))
+COLUMN_MASKS = tuple(sum(1 << (x * ARENA_SIZE + y) for y in range(ARENA_SIZE) if ARENA_MASK[x][y]) for x in range(ARENA_SIZE))
+BOTTOM_HALF = sum(ROW_MASKS[:ARENA_SIZE // 2])
+TOP_HALF = sum(ROW_MASKS[ARENA_SIZE // 2:])
+
+# Masks that stop a shift along y from wrapping into the neighboring column
+_NOT_TOP_ROW = ~ROW_MASKS[ARENA_SIZE - 1]
+_NOT_BOTTOM_ROW = ~ROW_MASKS[0]
+del _x, _y
+
+
+def contains(bitboard, location):
+    """Checks if a location's bit is set
+
+    Args:
+        * bitboard: A bitboard
+        * location: A map location
+
+    Returns:
+        True if the location is in the arena and its bit is set, False otherwise
+    """
+    x, y = location
+    if not (0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE):
+        return False
+    return bool(bitboard >> (x * ARENA_SIZE + y) & 1)
+
+
+def from_locations(locations):
+    """Creates a bitboard from a list of locations. Locations outside of the arena are ignored.
+    """
+    bitboard = 0
+    for x, y in locations:
+        if 0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE and ARENA_MASK[x][y]:
+            bitboard |= 1 << (x * ARENA_SIZE + y)
+    return bitboard
+
+
+def to_locations(bitboard):
+    """Lists the locations whose bits are set
+
+    Returns:
+        A list of [x, y] locations, ordered by x and then y
+    """
+    locations = []
+    while bitboard:
+        lowest = bitboard & -bitboard
+        x, y = divmod(lowest.bit_length() - 1, ARENA_SIZE)
+        locations.append([x, y])
+        bitboard ^= lowest
+    return locations
+
+
+def count(bitboard):
+    """Counts the locations whose bits are set
+    """
+    return bin(bitboard).count("1")
+
+
+def rows(y_values):
+    """Creates a bitboard of every arena tile in the given rows
+    """
+    bitboard = 0
+    for y in y_values:
+        if 0 <= y < ARENA_SIZE:
+            bitboard |= ROW_MASKS[y]
+    return bitboard
+
+
+def columns(x_values):
+    """Creates a bitboard of every arena tile in the given columns
+    """
+    bitboard = 0
+    for x in x_values:
+        if 0 <= x < ARENA_SIZE:
+            bitboard |= COLUMN_MASKS[x]
+    return bitboard
+
+
+def neighbors(bitboard):
+    """Gets the arena tiles next to any tile of a bitboard, moving up, down, left or right
+
+    Returns:
+        A bitboard of the adjacent tiles. Tiles of the original bitboard are only included if they are next to another one
+    """
+    adjacent = ((bitboard & _NOT_TOP_ROW) << 1) | ((bitboard & _NOT_BOTTOM_ROW) >> 1)
+    adjacent |= (bitboard << ARENA_SIZE) | (bitboard >> ARENA_SIZE)
+    return adjacent & ARENA
+
+
+def expand(bitboard, steps=1):
+    """Grows a bitboard by the given number of steps, adding every arena tile next to it each step
+
+    Returns:
+        A bitboard of the tiles within steps moves of the original bitboard
+    """
+    for _ in range(steps):
+        bitboard |= neighbors(bitboard)
+    return bitboard
@@ -1,7 +1,98 @@
+import copy
 import math
+import struct
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from .unit import GameUnit
 from .util import debug_write
 
+ARENA_SIZE = 28
+HALF_ARENA = ARENA_SIZE // 2
+
+
+def _in_diamond(x, y):
+    """Checks if a location is inside the diamond shaped game board using the board geometry.
+    """
+    row_size = y + 1
+    startx = HALF_ARENA - row_size
+    endx = startx + (2 * row_size) - 1
+    top_half_check = (y < HALF_ARENA and x >= startx and x <= endx)
+
+    row_size = (ARENA_SIZE - 1 - y) + 1
+    startx = HALF_ARENA - row_size
+    endx = startx + (2 * row_size) - 1
+    bottom_half_check = (y >= HALF_ARENA and x >= startx and x <= endx)
+
+    return bottom_half_check or top_half_check
+
+
+# The board geometry never changes, so these tables are computed once when the module is loaded.
+# ARENA_MASK[x][y] is True for every location on the board. The location tuples are in
+# iteration order: row by row from the bottom of the board, left to right within a row.
+ARENA_MASK = tuple(tuple(_in_diamond(x, y) for y in range(ARENA_SIZE)) for x in range(ARENA_SIZE))
+ARENA_LOCATIONS = tuple((x, y) for y in range(ARENA_SIZE) for x in range(ARENA_SIZE) if ARENA_MASK[x][y])
+BOTTOM_HALF_LOCATIONS = tuple(location for location in ARENA_LOCATIONS if location[1] < HALF_ARENA)
+TOP_HALF_LOCATIONS = tuple(location for location in ARENA_LOCATIONS if location[1] >= HALF_ARENA)
+
+_RANGE_STENCILS = {}
+
+
+def _get_range_stencil(radius, hit_radius):
+    """Gets the offsets of every location in range of a center location, computing them the first time a radius is used.
+
+    Returns:
+        A tuple of (dx, dy) offsets, ordered by dx and then dy
+    """
+    key = (radius, hit_radius)
+    stencil = _RANGE_STENCILS.get(key)
+    if stencil is None:
+        search_radius = math.ceil(radius)
+        offsets = range(-search_radius, search_radius + 1)
+        # A unit with a given range affects all locations who's centers are within that range + get hit radius
+        stencil = tuple((dx, dy) for dx in offsets for dy in offsets if math.sqrt(dx**2 + dy**2) < radius + hit_radius)
+        _RANGE_STENCILS[key] = stencil
+    return stencil
+
+# Binary encoding used by GameMap.to_bytes: a header of format version and unit count,
+# then one row of type index, owner, x, y, flags and health for each unit
+_BYTES_VERSION = 1
+_BYTES_HEADER = struct.Struct("<BH")
+_BYTES_UNIT = struct.Struct("<BBBBBd")
+_FLAG_UPGRADED = 1
+_FLAG_PENDING_REMOVAL = 2
+
+HEALTH_BUCKETS = 16
+_HASH_MASK = (1 << 64) - 1
+_HASH_SEED = 0x2545F4914F6CDD1D
+_HASH_KEYS = {}
+
+
+def _mix64(value):
+    """The splitmix64 finalizer, used to turn a packed tile description into a well distributed 64 bit key.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _HASH_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _HASH_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _HASH_MASK
+    return value ^ (value >> 31)
+
+
+def _get_hash_keys(index, type_index, owner, upgraded, health_bucket):
+    """Gets the board hash keys for a structure on a tile. The keys are the same in every process and every game.
+
+    Returns:
+        A tuple of the structure key, covering the tile, type, owner and upgraded flag, and the health key,
+        covering the tile and health bucket
+    """
+    description = (index, type_index, owner, upgraded, health_bucket)
+    keys = _HASH_KEYS.get(description)
+    if keys is None:
+        packed = ((index * 64 + type_index + 1) * 4 + owner + 1) * 2 + int(upgraded)
+        keys = (_mix64(_HASH_SEED ^ (packed << 1)), _mix64(_HASH_SEED ^ (((index * HEALTH_BUCKETS + health_bucket) << 1) | 1)))
+        _HASH_KEYS[description] = keys
+    return keys
+
 class GameMap:
     """Holds data about the current game map and provides functions
     useful for getting information related to the map.
@@ -29,14 +120,25 @@ class GameMap:
         """
         self.config = config
         self.enable_warnings = True
-        self.ARENA_SIZE = 28
-        self.HALF_ARENA = int(self.ARENA_SIZE / 2)
+        self.ARENA_SIZE = ARENA_SIZE
+        self.HALF_ARENA = HALF_ARENA
         self.TOP_RIGHT = 0
         self.TOP_LEFT = 1
         self.BOTTOM_LEFT = 2
         self.BOTTOM_RIGHT = 3
         self.__map = self.__empty_grid()
-        self.__start = [13,0]
+        self.__structures = None
+        self.__structure_index = None
+        self.__bitboards = None
+        self.__blocked_locations = None
+        self.__layers = None
+        self.__type_indices = None
+        self.__tile_hashes = None
+        self.__structure_hash = 0
+        self.__health_hash = 0
+        self.__hit_radius = config["unitInformation"][0]['getHitRadius']
+        self.__shared_tiles = None
+        self.__undo_log = None
     
     def __getitem__(self, location):
         if len(location) == 2 and self.in_arena_bounds(location):
@@ -46,26 +148,15 @@ class GameMap:
 
     def __setitem__(self, location, val):
         if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
-            self.__map[location[0]][location[1]] = val
+            self.__unshare_tile(location[0], location[1])
+            self.__set_tile(location[0], location[1], val)
             return
         self._invalid_coordinates(location)
 
     def __iter__(self):
-        self.__start = [13,0]
-        return self
-    
-    def __next__(self):
-        location = self.__start
-        if location == [15,27]:
-            raise StopIteration
-        new_location = [location[0]+1, location[1]]
-        while not self.in_arena_bounds(new_location) and not location == [14,27]:
-            if new_location[0] == self.ARENA_SIZE:
-                new_location = [0, new_location[1]+1]
-            else:
-                new_location = [new_location[0]+1, new_location[1]]
-        self.__start = new_location
-        return location 
+        # A new generator for each loop, so nested loops over the map don't interfere
+        for x, y in ARENA_LOCATIONS:
+            yield [x, y]
 
     def __empty_grid(self):
         grid = []
@@ -89,19 +180,10 @@ class GameMap:
         
         """
         x, y = location
-        half_board = self.HALF_ARENA
-
-        row_size = y + 1
-        startx = half_board - row_size
-        endx = startx + (2 * row_size) - 1
-        top_half_check = (y < self.HALF_ARENA and x >= startx and x <= endx)
-
-        row_size = (self.ARENA_SIZE - 1 - y) + 1
-        startx = half_board - row_size
-        endx = startx + (2 * row_size) - 1
-        bottom_half_check = (y >= self.HALF_ARENA and x >= startx and x <= endx)
-
-        return bottom_half_check or top_half_check
+        if type(x) is int and type(y) is int:
+            return 0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE and ARENA_MASK[x][y]
+        # Other coordinates, such as floats, can't index the mask
+        return _in_diamond(x, y)
 
     def get_edge_locations(self, quadrant_description):
         """Takes in an edge description and returns a list of locations.
@@ -169,9 +251,11 @@ class GameMap:
         x, y = location
         new_unit = GameUnit(unit_type, self.config, player_index, None, location[0], location[1])
         if not new_unit.stationary:
-            self.__map[x][y].append(new_unit)
+            # Tile lists may be shared with forked maps or the undo log, so they are replaced rather than changed in place
+            self.__set_tile(x, y, self.__map[x][y] + [new_unit])
         else:
-            self.__map[x][y] = [new_unit]
+            self.__unshare_tile(x, y)
+            self.__set_tile(x, y, [new_unit])
 
     def remove_unit(self, location):
         """Remove all units on the map in the given location.
@@ -186,7 +270,393 @@ class GameMap:
             self._invalid_coordinates(location)
         
         x, y = location
-        self.__map[x][y] = []
+        self.__unshare_tile(x, y)
+        self.__set_tile(x, y, [])
+
+    def fork(self):
+        """Creates a copy of the map that shares its unchanged tiles and units with this one.
+
+        Only the location grid and the indexes are copied, so this is far cheaper than copy.deepcopy.
+        add_unit, remove_unit and item assignment replace a tile's list instead of changing it, so edits
+        to either map are never seen by the other. Units shared between the maps are copied by
+        _detach_tile before they are changed, for example by GameState.attempt_upgrade. Code that changes
+        units or tile lists in place on a forked map must call _detach_tile first.
+
+        Returns:
+            A new GameMap with the same units
+        """
+        child = copy.copy(self)
+        child.__map = [list(column) for column in self.__map]
+        if self.__structures is not None:
+            child.__structures = dict(self.__structures)
+            child.__structure_index = {key: set(locations) for key, locations in self.__structure_index.items()}
+            child.__bitboards = dict(self.__bitboards)
+        if self.__layers is not None:
+            child.__layers = {name: layer.copy() for name, layer in self.__layers.items()}
+        if self.__tile_hashes is not None:
+            child.__tile_hashes = list(self.__tile_hashes)
+        # Every occupied tile is now shared by both maps
+        shared_tiles = set(location for location in ARENA_LOCATIONS if self.__map[location[0]][location[1]])
+        self.__shared_tiles = shared_tiles
+        child.__shared_tiles = set(shared_tiles)
+        child.__undo_log = None
+        return child
+
+    def mirrored(self):
+        """Gets a view of this map from the opponent's side of the board, see MirroredGameMap.
+
+        Returns:
+            A MirroredGameMap over this map. No units are copied
+        """
+        return MirroredGameMap(self)
+
+    def _detach_tile(self, x, y):
+        """Gives this map its own copies of the units on a tile if they are shared with a forked map
+        or could be restored by rollback, so they can be changed safely.
+
+        Returns:
+            The list of units on the tile
+        """
+        if (self.__shared_tiles is not None and (x, y) in self.__shared_tiles) or self.__undo_log is not None:
+            self.__unshare_tile(x, y)
+            self.__set_tile(x, y, [copy.copy(unit) for unit in self.__map[x][y]])
+        return self.__map[x][y]
+
+    def __unshare_tile(self, x, y):
+        if self.__shared_tiles is not None:
+            self.__shared_tiles.discard((x, y))
+
+    def __set_tile(self, x, y, units):
+        """Replaces the list of units on a tile, recording the old list if a savepoint is open.
+        """
+        if self.__undo_log is not None:
+            self.__undo_log.append((x, y, self.__map[x][y]))
+        self.__map[x][y] = units
+        self._update_tile(x, y)
+
+    def savepoint(self):
+        """Starts recording changes to the map so that they can be undone with rollback.
+
+        Savepoints can be nested. Changes are recorded until commit is called.
+
+        Returns:
+            A savepoint to pass to rollback
+        """
+        if self.__undo_log is None:
+            self.__undo_log = []
+        # A marker in the undo log identifies the savepoint, so that it is refused once it has been committed or rolled back past
+        marker = object()
+        self.__undo_log.append(marker)
+        return (len(self.__undo_log) - 1, marker)
+
+    def rollback(self, savepoint):
+        """Undoes every change made to the map since a savepoint was created.
+
+        This takes time proportional to the number of changes. The savepoint stays valid, and can be rolled back to again.
+
+        Args:
+            savepoint: A savepoint returned by savepoint since the last commit
+
+        Returns:
+            True if the map was rolled back, False if the savepoint was already committed or rolled back past
+        """
+        undo_log = self.__undo_log
+        index, marker = savepoint
+        if undo_log is None or index >= len(undo_log) or undo_log[index] is not marker:
+            self.warn("Cannot roll back to savepoint {}. It was already committed or rolled back past.".format(index))
+            return False
+        while len(undo_log) > index + 1:
+            entry = undo_log.pop()
+            if type(entry) is not tuple:
+                # The marker of a later savepoint
+                continue
+            x, y, units = entry
+            self.__map[x][y] = units
+            # The restored list may still be shared with a map forked before it was replaced
+            if self.__shared_tiles is not None:
+                self.__shared_tiles.add((x, y))
+            self._update_tile(x, y)
+        return True
+
+    def commit(self):
+        """Keeps every change made since the first open savepoint and stops recording changes.
+        """
+        self.__undo_log = None
+
+    def _update_tile(self, x, y):
+        """Brings the structure index, cached blocked locations and numpy layers up to date with the units on a tile.
+
+        add_unit, remove_unit and item assignment call this themselves. Code that changes the units
+        on a tile in place, such as appending to game_map[x, y] or upgrading a unit, must call it afterwards.
+        """
+        units = self.__map[x][y]
+        structure = None
+        for unit in units:
+            if unit.stationary:
+                structure = unit
+
+        structures = self.__structures
+        if structures is not None:
+            location = (x, y)
+            old_structure = structures.get(location)
+            if old_structure is not structure:
+                bit = 1 << (x * ARENA_SIZE + y)
+                if old_structure is not None:
+                    del structures[location]
+                    key = (old_structure.player_index, old_structure.unit_type)
+                    self.__structure_index[key].discard(location)
+                    self.__bitboards[key] &= ~bit
+                if structure is not None:
+                    structures[location] = structure
+                    key = (structure.player_index, structure.unit_type)
+                    self.__structure_index.setdefault(key, set()).add(location)
+                    self.__bitboards[key] = self.__bitboards.get(key, 0) | bit
+                if (old_structure is None) != (structure is None):
+                    self.__blocked_locations = None
+
+        if self.__tile_hashes is not None:
+            index = x * ARENA_SIZE + y
+            old_structure_key, old_health_key = self.__tile_hashes[index]
+            if structure is None:
+                structure_key = health_key = 0
+            else:
+                structure_key, health_key = self.__get_structure_hash_keys(index, structure)
+            self.__tile_hashes[index] = (structure_key, health_key)
+            self.__structure_hash ^= old_structure_key ^ structure_key
+            self.__health_hash ^= old_health_key ^ health_key
+
+        layers = self.__layers
+        if layers is None:
+            return
+        structure_type = -1
+        owner = -1
+        health = 0.0
+        upgraded = False
+        if structure is not None:
+            structure_type = self.__get_type_indices().get(structure.unit_type, -1)
+            owner = structure.player_index
+            health = structure.health
+            upgraded = structure.upgraded
+        mobile_counts = [0, 0]
+        for unit in units:
+            if not unit.stationary:
+                mobile_counts[unit.player_index] += 1
+        layers["structure_type"][x, y] = structure_type
+        layers["owner"][x, y] = owner
+        layers["health"][x, y] = health
+        layers["upgraded"][x, y] = upgraded
+        layers["mobile_counts"][:, x, y] = mobile_counts
+
+    def __get_type_indices(self):
+        if self.__type_indices is None:
+            self.__type_indices = {}
+            for index, unit_information in enumerate(self.config["unitInformation"]):
+                self.__type_indices.setdefault(unit_information.get("shorthand"), index)
+        return self.__type_indices
+
+    def __get_structure_hash_keys(self, index, structure):
+        health_bucket = 0
+        if structure.max_health > 0:
+            health_bucket = min(HEALTH_BUCKETS - 1, max(0, int(HEALTH_BUCKETS * structure.health / structure.max_health)))
+        type_index = self.__get_type_indices().get(structure.unit_type, -1)
+        return _get_hash_keys(index, type_index, structure.player_index, structure.upgraded, health_bucket)
+
+    def to_bytes(self):
+        """Encodes the units on the map in a compact binary form, for sending to other processes or caching on disk.
+
+        Each unit takes 13 bytes, so a typical map is a few KB, where pickling it would also copy the config
+        into every unit. The type, owner, location, health, upgraded flag and pending removal flag of each unit are kept.
+
+        Returns:
+            A bytes object that from_bytes turns back into a GameMap
+        """
+        type_indices = self.__get_type_indices()
+        rows = []
+        for x, y in ARENA_LOCATIONS:
+            for unit in self.__map[x][y]:
+                flags = (_FLAG_UPGRADED if unit.upgraded else 0) | (_FLAG_PENDING_REMOVAL if unit.pending_removal else 0)
+                rows.append(_BYTES_UNIT.pack(type_indices[unit.unit_type], unit.player_index, x, y, flags, unit.health))
+        return _BYTES_HEADER.pack(_BYTES_VERSION, len(rows)) + b"".join(rows)
+
+    @classmethod
+    def from_bytes(cls, data, config):
+        """Decodes a map encoded by to_bytes
+
+        Args:
+            data: The bytes returned by to_bytes
+            config: The game config to attach to the map and its units. It is shared, not copied
+
+        Returns:
+            A new GameMap holding the encoded units, or None if the data is not a valid encoding
+        """
+        game_map = cls(config)
+        if len(data) < _BYTES_HEADER.size:
+            game_map.warn("Cannot decode a GameMap from {} bytes".format(len(data)))
+            return None
+        version, unit_count = _BYTES_HEADER.unpack_from(data)
+        if version != _BYTES_VERSION or len(data) != _BYTES_HEADER.size + unit_count * _BYTES_UNIT.size:
+            game_map.warn("Cannot decode a GameMap, the data is from a different version or truncated")
+            return None
+
+        unit_information = config["unitInformation"]
+        for type_index, player_index, x, y, flags, health in _BYTES_UNIT.iter_unpack(data[_BYTES_HEADER.size:]):
+            unit = GameUnit(unit_information[type_index]["shorthand"], config, player_index, health, x, y)
+            if flags & _FLAG_UPGRADED:
+                unit.upgrade()
+            unit.pending_removal = bool(flags & _FLAG_PENDING_REMOVAL)
+            unit.health = health
+            # The indexes of a new map are built on first use, so units can be added in place
+            game_map.__map[x][y].append(unit)
+        return game_map
+
+    def get_board_hash(self, include_health=False):
+        """Gets a 64 bit hash of the structures on the map, for use as a cache key.
+
+        The hash covers the type, owner, location and upgraded flag of every structure. It is computed the first
+        time it is needed and then updated in constant time as units are added, removed, upgraded or parsed.
+        The same layout always has the same hash, in any process. Mobile units are not included.
+
+        Args:
+            include_health: If True, the health of each structure is also included, rounded down to
+                one of HEALTH_BUCKETS fractions of its starting health
+
+        Returns:
+            The hash as a non-negative int below 2 ** 64
+
+        """
+        if self.__tile_hashes is None:
+            self.__tile_hashes = [(0, 0)] * (ARENA_SIZE * ARENA_SIZE)
+            self.__structure_hash = 0
+            self.__health_hash = 0
+            for x, y in ARENA_LOCATIONS:
+                if self.__map[x][y]:
+                    self._update_tile(x, y)
+        if include_health:
+            return self.__structure_hash ^ self.__health_hash
+        return self.__structure_hash
+
+    def get_layers(self):
+        """Gets dense numpy layers describing the units on every tile, for vectorized heuristics.
+
+        The layers are built the first time this is called, and are then kept up to date as the map changes,
+        so the same arrays are returned each time. Treat them as read only. All layers are indexed [x, y]
+        and tiles outside of the arena hold the empty values.
+
+        Returns:
+            None if numpy is not installed. Otherwise a dict of numpy arrays:
+
+            * structure_type: The index in config["unitInformation"] of the structure on each tile, -1 if there is none
+            * owner: The player index of the structure on each tile, -1 if there is none
+            * health: The health of the structure on each tile, 0 if there is none
+            * upgraded: True for each tile holding an upgraded structure
+            * mobile_counts: An array of shape (2, ARENA_SIZE, ARENA_SIZE) holding the number of mobile units of each player on each tile
+
+        """
+        if np is None:
+            self.warn("get_layers requires numpy, which is not installed")
+            return None
+        if self.__layers is None:
+            shape = (self.ARENA_SIZE, self.ARENA_SIZE)
+            self.__layers = {
+                "structure_type": np.full(shape, -1, dtype=np.int8),
+                "owner": np.full(shape, -1, dtype=np.int8),
+                "health": np.zeros(shape, dtype=np.float64),
+                "upgraded": np.zeros(shape, dtype=bool),
+                "mobile_counts": np.zeros((2,) + shape, dtype=np.int32),
+            }
+            for x in range(self.ARENA_SIZE):
+                for y in range(self.ARENA_SIZE):
+                    if self.__map[x][y]:
+                        self._update_tile(x, y)
+        return self.__layers
+
+    def get_blocked_locations(self):
+        """Gets the locations of every structure on the map.
+
+        The result is cached until add_unit, remove_unit or item assignment changes a structure,
+        so it can be used cheaply as a key for anything that depends on the structure layout.
+
+        Returns:
+            A frozenset of (x, y) tuples, one for each location holding a structure
+
+        """
+        if self.__blocked_locations is None:
+            self.__blocked_locations = frozenset(self.__index_structures())
+        return self.__blocked_locations
+
+    def __index_structures(self):
+        """Builds the index of structures by location and by player and type the first time it is needed.
+
+        Returns:
+            A dict from (x, y) to the structure at that location
+        """
+        if self.__structures is None:
+            structures = {}
+            structure_index = {}
+            bitboards = {}
+            for x, y in ARENA_LOCATIONS:
+                for unit in self.__map[x][y]:
+                    if unit.stationary:
+                        key = (unit.player_index, unit.unit_type)
+                        structures[(x, y)] = unit
+                        structure_index.setdefault(key, set()).add((x, y))
+                        bitboards[key] = bitboards.get(key, 0) | 1 << (x * ARENA_SIZE + y)
+            self.__structures = structures
+            self.__structure_index = structure_index
+            self.__bitboards = bitboards
+        return self.__structures
+
+    def get_bitboard(self, player_index=None, unit_type=None):
+        """Gets a bitboard of the structures on the map, for set algebra with the functions in gamelib.bitboard.
+
+        Bitboards are kept up to date as the map changes, so this only combines a few ints.
+
+        Args:
+            player_index: If given, only structures owned by this player are included
+            unit_type: If given, only structures of this type are included
+
+        Returns:
+            An int with bit x * ARENA_SIZE + y set for each matching structure. With no arguments, this is every blocked location.
+
+        """
+        self.__index_structures()
+        bitboard = 0
+        for (owner, structure_type), type_bitboard in self.__bitboards.items():
+            if (player_index is None or owner == player_index) and (unit_type is None or structure_type == unit_type):
+                bitboard |= type_bitboard
+        return bitboard
+
+    def iter_structures(self, player_index=None, unit_type=None, region=None):
+        """Iterates over the structures on the map, visiting only the occupied tiles.
+
+        Structures are looked up in an index kept up to date as the map changes, so this is much
+        cheaper than checking all of the map's locations.
+
+        Args:
+            player_index: If given, only structures owned by this player are included
+            unit_type: If given, only structures of this type are included
+            region: If given, a collection of locations. Only structures on these locations are included
+
+        Yields:
+            The structures as GameUnits, in the same location order as iterating over the map
+
+        """
+        structures = self.__index_structures()
+        if player_index is None and unit_type is None:
+            locations = structures.keys()
+        else:
+            locations = set()
+            for (owner, structure_type), type_locations in self.__structure_index.items():
+                if (player_index is None or owner == player_index) and (unit_type is None or structure_type == unit_type):
+                    locations.update(type_locations)
+        if region is not None:
+            region = set(tuple(location) for location in region)
+            locations = [location for location in locations if location in region]
+        for location in sorted(locations, key=lambda location: (location[1], location[0])):
+            # The map may be changed while iterating
+            structure = structures.get(location)
+            if structure is not None:
+                yield structure
 
     def get_locations_in_range(self, location, radius):
         """Gets locations in a circular area around a location
@@ -205,9 +675,19 @@ class GameMap:
             self._invalid_coordinates(location)
 
         x, y = location
+        if type(x) is int and type(y) is int:
+            locations = []
+            for dx, dy in _get_range_stencil(radius, self.__hit_radius):
+                i = x + dx
+                j = y + dy
+                if 0 <= i < ARENA_SIZE and 0 <= j < ARENA_SIZE and ARENA_MASK[i][j]:
+                    locations.append([i, j])
+            return locations
+
+        # Locations that aren't whole numbers are measured directly
         locations = []
         search_radius = math.ceil(radius)
-        getHitRadius = self.config["unitInformation"][0]['getHitRadius']
+        getHitRadius = self.__hit_radius
         for i in range(int(x - search_radius), int(x + search_radius + 1)):
             for j in range(int(y - search_radius), int(y + search_radius + 1)):
                 new_location = [i, j]
@@ -238,3 +718,184 @@ class GameMap:
         """
         if(self.enable_warnings):
             debug_write(message)
+
+
+def _mirror_player_index(player_index):
+    return 1 - player_index if player_index in (0, 1) else player_index
+
+
+class MirroredUnit(GameUnit):
+    """A view of a GameUnit from the opponent's side of the board
+
+    y is mirrored to ARENA_SIZE - 1 - y, and player_index 0 and 1 are swapped. Every other attribute is read
+    from and written to the underlying unit, so no unit data is copied.
+
+    Attributes :
+        * unit (:obj: GameUnit): The underlying unit
+    """
+    def __init__(self, unit):
+        object.__setattr__(self, "unit", unit)
+
+    @property
+    def y(self):
+        return ARENA_SIZE - 1 - self.unit.y
+
+    @property
+    def player_index(self):
+        return _mirror_player_index(self.unit.player_index)
+
+    def __getattr__(self, name):
+        return getattr(self.unit, name)
+
+    def __setattr__(self, name, value):
+        if name == "y":
+            value = ARENA_SIZE - 1 - value
+        elif name == "player_index":
+            value = _mirror_player_index(value)
+        setattr(self.unit, name, value)
+
+    def upgrade(self):
+        self.unit.upgrade()
+
+
+class MirroredGameMap:
+    """A view of a GameMap from the opponent's side of the board
+
+    Location [x, y] of the view is location [x, ARENA_SIZE - 1 - y] of the underlying map, and units are
+    returned as MirroredUnits, so player 0 of the view is player 1 of the map. The bottom edges of the
+    view are the opponent's spawn edges. Nothing is parsed or copied: reads and edits go straight
+    to the underlying map, and the board geometry is shared with it, since the arena is symmetric.
+
+    It supports the location access, query and editing methods of GameMap. Methods that depend on how
+    the map is stored, such as to_bytes and get_board_hash, are only available on the underlying map.
+
+    Attributes :
+        * game_map (:obj: GameMap): The underlying map
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.config = game_map.config
+        self.ARENA_SIZE = game_map.ARENA_SIZE
+        self.HALF_ARENA = game_map.HALF_ARENA
+        self.TOP_RIGHT = game_map.TOP_RIGHT
+        self.TOP_LEFT = game_map.TOP_LEFT
+        self.BOTTOM_LEFT = game_map.BOTTOM_LEFT
+        self.BOTTOM_RIGHT = game_map.BOTTOM_RIGHT
+        self.__blocked_source = None
+        self.__blocked_locations = None
+
+        # The arena and its edges are symmetric, so geometry queries need no mirroring
+        self.in_arena_bounds = game_map.in_arena_bounds
+        self.get_edge_locations = game_map.get_edge_locations
+        self.get_edges = game_map.get_edges
+        self.get_locations_in_range = game_map.get_locations_in_range
+        self.distance_between_locations = game_map.distance_between_locations
+        self.warn = game_map.warn
+        self.savepoint = game_map.savepoint
+        self.rollback = game_map.rollback
+        self.commit = game_map.commit
+
+    @property
+    def enable_warnings(self):
+        return self.game_map.enable_warnings
+
+    @enable_warnings.setter
+    def enable_warnings(self, enable_warnings):
+        self.game_map.enable_warnings = enable_warnings
+
+    def __getitem__(self, location):
+        if len(location) == 2 and self.in_arena_bounds(location):
+            x, y = location
+            return [MirroredUnit(unit) for unit in self.game_map[x, ARENA_SIZE - 1 - y]]
+        self.game_map._invalid_coordinates(location)
+
+    def __setitem__(self, location, val):
+        if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
+            units = [unit.unit if isinstance(unit, MirroredUnit) else unit for unit in val]
+            self.game_map[location[0], ARENA_SIZE - 1 - location[1]] = units
+            return
+        self.game_map._invalid_coordinates(location)
+
+    def __iter__(self):
+        for x, y in ARENA_LOCATIONS:
+            yield [x, y]
+
+    def mirrored(self):
+        """Gets the underlying map, which is the mirror of this view
+        """
+        return self.game_map
+
+    def fork(self):
+        """Forks the underlying map, see GameMap.fork
+
+        Returns:
+            A MirroredGameMap over the fork
+        """
+        return MirroredGameMap(self.game_map.fork())
+
+    def add_unit(self, unit_type, location, player_index=0):
+        """Adds a unit to the underlying map at the mirrored location, for the other player. See GameMap.add_unit
+        """
+        self.game_map.add_unit(unit_type, [location[0], ARENA_SIZE - 1 - location[1]], _mirror_player_index(player_index))
+
+    def remove_unit(self, location):
+        """Removes all units from the mirrored location of the underlying map. See GameMap.remove_unit
+        """
+        self.game_map.remove_unit([location[0], ARENA_SIZE - 1 - location[1]])
+
+    def _update_tile(self, x, y):
+        self.game_map._update_tile(x, ARENA_SIZE - 1 - y)
+
+    def _detach_tile(self, x, y):
+        return [MirroredUnit(unit) for unit in self.game_map._detach_tile(x, ARENA_SIZE - 1 - y)]
+
+    def get_blocked_locations(self):
+        """Gets the mirrored locations of every structure. See GameMap.get_blocked_locations
+        """
+        blocked_locations = self.game_map.get_blocked_locations()
+        if blocked_locations is not self.__blocked_source:
+            self.__blocked_locations = frozenset((x, ARENA_SIZE - 1 - y) for x, y in blocked_locations)
+            self.__blocked_source = blocked_locations
+        return self.__blocked_locations
+
+    def get_bitboard(self, player_index=None, unit_type=None):
+        """Gets a bitboard of the structures in the view. See GameMap.get_bitboard
+        """
+        if player_index is not None:
+            player_index = _mirror_player_index(player_index)
+        bitboard = self.game_map.get_bitboard(player_index, unit_type)
+        mirrored = 0
+        while bitboard:
+            lowest = bitboard & -bitboard
+            x, y = divmod(lowest.bit_length() - 1, ARENA_SIZE)
+            mirrored |= 1 << (x * ARENA_SIZE + ARENA_SIZE - 1 - y)
+            bitboard ^= lowest
+        return mirrored
+
+    def iter_structures(self, player_index=None, unit_type=None, region=None):
+        """Iterates over the structures in the view. See GameMap.iter_structures
+        """
+        if player_index is not None:
+            player_index = _mirror_player_index(player_index)
+        if region is not None:
+            region = [[x, ARENA_SIZE - 1 - y] for x, y in region]
+        structures = [MirroredUnit(unit) for unit in self.game_map.iter_structures(player_index, unit_type, region)]
+        structures.sort(key=lambda unit: (unit.y, unit.x))
+        return iter(structures)
+
+    def get_layers(self):
+        """Gets the numpy layers of the view. See GameMap.get_layers
+
+        The layers are mirrored copies, so unlike GameMap.get_layers, a new dict is built on each call.
+        """
+        layers = self.game_map.get_layers()
+        if layers is None:
+            return None
+        owner = layers["owner"][:, ::-1]
+        return {
+            "structure_type": layers["structure_type"][:, ::-1],
+            "owner": np.where(owner >= 0, 1 - owner, owner).astype(owner.dtype),
+            "health": layers["health"][:, ::-1],
+            "upgraded": layers["upgraded"][:, ::-1],
+            "mobile_counts": layers["mobile_counts"][::-1, :, ::-1],
+        }
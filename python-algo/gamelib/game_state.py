@@ -1,11 +1,27 @@
+import copy
 import math
-import json
+import struct
 import sys
 
-from .navigation import ShortestPathFinder
-from .util import send_command, debug_write
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .navigation import ShortestPathFinder, PathCache, PathfindingStats
+from .util import send_command, debug_write, decode_message, json_dumps
 from .unit import GameUnit
-from .game_map import GameMap
+from .game_map import GameMap, ARENA_LOCATIONS
+
+# A turn string with no units, for game states that are filled in afterwards
+_EMPTY_TURN = """{"p2Units":[[],[],[],[],[],[],[],[]],"turnInfo":[0,0,-1],"p1Stats":[30.0,25.0,5.0,0],"p1Units":[[],[],[],[],[],[],[],[]],"p2Stats":[30.0,25.0,5.0,0],"events":{}}"""
+
+# Binary encoding used by GameState.to_bytes: a header holding the format version, turn number, health and time
+# of each player, resources of each player, the build and deploy stack lengths and the length of the encoded map.
+# It is followed by one row of type index, x and y for each stack entry, then the map encoded by GameMap.to_bytes
+_BYTES_VERSION = 1
+_BYTES_HEADER = struct.Struct("<Bi8dHHI")
+_BYTES_STACK_ENTRY = struct.Struct("<BBB")
 
 def is_stationary(unit_type):
     """
@@ -38,26 +54,35 @@ class GameState:
         * MP (int): A constant representing the Mobile Points resource, used in the get_resource function
         * SP (int): A constant representing the SP resource, used in the get_resource function
          
-        * game_map (:obj: GameMap): The current GameMap. To retrieve a list of GameUnits at a location, use game_map[x, y]
+        * game_map (:obj: GameMap): The current GameMap. To retrieve a list of GameUnits at a location, use game_map[x, y].
+          In a lazily parsed game state, the units are added to the map the first time it is used
         * turn_number (int): The current turn number. Starts at 0.
         * my_health (int): Your current remaining health
         * my_time (int): The time you took to submit your previous turn
         * enemy_health (int): Your opponents current remaining health
         * enemy_time (int): Your opponents current remaining time
+        * change_set (dict): For a game state made by update_from, the structures that changed since the previous turn.
+          None otherwise
 
     """
 
-    def __init__(self, config, serialized_string):
+    def __init__(self, config, serialized_string, lazy=False):
         """ Setup a turns variables using arguments passed
 
         Args:
             * config (JSON): A json object containing information about the game
-            * serialized_string (string): A string containing information about the game state at the start of this turn
+            * serialized_string (string): A string containing information about the game state at the start of this turn.
+              A ParsedMessage or an already decoded dict is used without decoding it again
+            * lazy (bool): If True, only the turn number, health, time and resources are parsed up front. Units are
+              parsed the first time game_map is used, or for a single player and category by get_structures and get_mobile_units
 
         """
         self.serialized_string = serialized_string
         self.config = config
         self.enable_warnings = True
+        self.lazy = lazy
+        self.change_set = None
+        self._read_only = False
 
         global WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR, REMOVE, UPGRADE, STRUCTURE_TYPES, ALL_UNITS, UNIT_TYPE_TO_INDEX
         UNIT_TYPE_TO_INDEX = {}
@@ -91,6 +116,7 @@ class GameState:
 
         self.game_map = GameMap(self.config)
         self._shortest_path_finder = ShortestPathFinder()
+        self._path_cache = PathCache()
         self._build_stack = []
         self._deploy_stack = []
         self._player_resources = [
@@ -101,9 +127,9 @@ class GameState:
     def __parse_state(self, state_line):
         """
         Fills in map based on the serialized game state so that self.game_map[x,y] is a list of GameUnits at that location.
-        state_line is the game state as a json string.
+        state_line is the game state as a json string, a ParsedMessage or a decoded dict.
         """
-        state = json.loads(state_line)
+        state = decode_message(state_line)
 
         turn_info = state["turnInfo"]
         self.turn_number = int(turn_info[1])
@@ -123,6 +149,10 @@ class GameState:
         p1units = state["p1Units"]
         p2units = state["p2Units"]
 
+        if self.lazy:
+            self._unparsed_units = [p1units, p2units]
+            self._parsed_units = {}
+            return
         self.__create_parsed_units(p1units, 0)
         self.__create_parsed_units(p2units, 1)
 
@@ -145,9 +175,184 @@ class GameState:
                 elif unit_type == UPGRADE:
                     if self.contains_stationary_unit([x,y]):
                         self.game_map[x,y][0].upgrade()
+                        self.game_map._update_tile(x, y)
                 else:
                     unit = GameUnit(unit_type, self.config, player_number, hp, x, y)
                     self.game_map[x,y].append(unit)
+                    self.game_map._update_tile(x, y)
+
+    def __parse_lazy_units(self, player_index, structures, previous_structures=None):
+        """
+        Helper function for lazily parsed game states. Creates the structures or the mobile units of a player,
+        only once, applying pending removals and upgrades to the structures.
+        previous_structures is an optional dict mapping locations to structures of an earlier turn. A structure there with
+        the same owner and type is reused and taken out of the dict, unless it is upgraded and no longer should be.
+        """
+        key = (player_index, structures)
+        if key in self._parsed_units:
+            return self._parsed_units[key]
+        typedef = self.config.get("unitInformation")
+        unparsed_units = self._unparsed_units[player_index]
+        upgraded_locations = set()
+        if previous_structures is not None:
+            for i, unit_types in enumerate(unparsed_units):
+                if typedef[i].get("shorthand") == UPGRADE:
+                    upgraded_locations.update((int(uinfo[0]), int(uinfo[1])) for uinfo in unit_types)
+        units = []
+        marks = []
+        for i, unit_types in enumerate(unparsed_units):
+            unit_type = typedef[i].get("shorthand")
+            if unit_type == REMOVE or unit_type == UPGRADE:
+                if structures:
+                    marks.append((unit_type, unit_types))
+            elif is_stationary(unit_type) == structures:
+                for uinfo in unit_types:
+                    sx, sy, shp = uinfo[:3]
+                    x, y = map(int, [sx, sy])
+                    hp = float(shp)
+                    unit = previous_structures.get((x, y)) if previous_structures is not None else None
+                    if unit is not None and unit.unit_type == unit_type and unit.player_index == player_index and (not unit.upgraded or (x, y) in upgraded_locations):
+                        del previous_structures[(x, y)]
+                        unit.pending_removal = False
+                        unit.health = unit.max_health if not hp else hp
+                    else:
+                        unit = GameUnit(unit_type, self.config, player_index, hp, x, y)
+                    units.append(unit)
+        if marks:
+            by_location = {(unit.x, unit.y): unit for unit in units}
+            for unit_type, unit_types in marks:
+                for uinfo in unit_types:
+                    unit = by_location.get((int(uinfo[0]), int(uinfo[1])))
+                    if unit is None:
+                        continue
+                    if unit_type == REMOVE:
+                        unit.pending_removal = True
+                    elif not unit.upgraded:
+                        unit.upgrade()
+        self._parsed_units[key] = units
+        return units
+
+    @property
+    def game_map(self):
+        if self._unparsed_units is not None:
+            # Units must be added in the same order as __create_parsed_units adds them
+            game_map = self._game_map
+            for player_index in (0, 1):
+                for structures in (True, False):
+                    for unit in self.__parse_lazy_units(player_index, structures):
+                        game_map[unit.x, unit.y].append(unit)
+                        game_map._update_tile(unit.x, unit.y)
+            self._unparsed_units = None
+            self._parsed_units = None
+        return self._game_map
+
+    @game_map.setter
+    def game_map(self, game_map):
+        self._game_map = game_map
+        self._unparsed_units = None
+        self._parsed_units = None
+
+    @classmethod
+    def update_from(cls, previous_state, new_turn_string):
+        """Creates the game state of a new turn from the game state of the previous turn.
+
+        Structures that are still in the same place, with the same owner and type, are reused instead of created again.
+        Their health, pending removal and upgrades are updated in place, so previous_state and its forks should
+        not be used afterwards. Mobile units are always created. Like a lazily parsed game state, mobile units
+        are only created when game_map is first used.
+
+        Args:
+            * previous_state: The GameState of the previous turn
+            * new_turn_string: The game state message of the new turn, as a string, ParsedMessage or decoded dict
+
+        Returns:
+            A GameState for the new turn. Its change_set attribute is a dict of lists of structures, ordered by location like
+            iter_structures. "added" holds new structures, "removed" holds structures of the previous turn that are gone,
+            "damaged" holds reused structures that lost health and "upgraded" holds reused structures that were upgraded.
+            A structure replaced by a different one at the same location is both removed and added
+
+        """
+        state = cls(previous_state.config, new_turn_string, lazy=True)
+        state.suppress_warnings(not previous_state.enable_warnings)
+        previous_structures = {}
+        for player_index in (0, 1):
+            for unit in previous_state.get_structures(player_index):
+                previous_structures[(unit.x, unit.y)] = unit
+        previous_values = {location: (unit.health, unit.upgraded) for location, unit in previous_structures.items()}
+
+        added = []
+        damaged = []
+        upgraded = []
+        for player_index in (0, 1):
+            for unit in state.__parse_lazy_units(player_index, True, previous_structures):
+                location = (unit.x, unit.y)
+                # Reused structures have been taken out of previous_structures
+                if location not in previous_values or location in previous_structures:
+                    added.append(unit)
+                    continue
+                health, was_upgraded = previous_values[location]
+                if unit.health < health:
+                    damaged.append(unit)
+                if unit.upgraded and not was_upgraded:
+                    upgraded.append(unit)
+
+        def location_order(unit):
+            return (unit.y, unit.x)
+        state.change_set = {
+            "added": sorted(added, key=location_order),
+            "removed": sorted(previous_structures.values(), key=location_order),
+            "damaged": sorted(damaged, key=location_order),
+            "upgraded": sorted(upgraded, key=location_order),
+        }
+        return state
+
+    def get_structures(self, player_index=0, unit_type=None):
+        """Gets the structures of a player. In a lazily parsed game state that has not used game_map yet,
+        only that player's structures are parsed, so this is cheaper than going through the map.
+
+        Args:
+            player_index: The index corresponding to the player, 0 for you 1 for the enemy
+            unit_type: If given, only structures of this type are included
+
+        Returns:
+            A list of GameUnits, in the same location order as iterating over the map
+
+        """
+        if not player_index == 0 and not player_index == 1:
+            self._invalid_player_index(player_index)
+            return
+        if self._unparsed_units is None:
+            return list(self.game_map.iter_structures(player_index, unit_type))
+        structures = [unit for unit in self.__parse_lazy_units(player_index, True) if unit_type is None or unit.unit_type == unit_type]
+        structures.sort(key=lambda unit: (unit.y, unit.x))
+        return structures
+
+    def get_mobile_units(self, player_index=0, unit_type=None):
+        """Gets the mobile units of a player. In a lazily parsed game state that has not used game_map yet,
+        only that player's mobile units are parsed, so this is cheaper than going through the map.
+
+        Args:
+            player_index: The index corresponding to the player, 0 for you 1 for the enemy
+            unit_type: If given, only mobile units of this type are included
+
+        Returns:
+            A list of GameUnits, in the same location order as iterating over the map
+
+        """
+        if not player_index == 0 and not player_index == 1:
+            self._invalid_player_index(player_index)
+            return
+        if self._unparsed_units is None:
+            game_map = self.game_map
+            mobile_units = []
+            for x, y in ARENA_LOCATIONS:
+                for unit in game_map[x, y]:
+                    if not unit.stationary and unit.player_index == player_index and (unit_type is None or unit.unit_type == unit_type):
+                        mobile_units.append(unit)
+            return mobile_units
+        mobile_units = [unit for unit in self.__parse_lazy_units(player_index, False) if unit_type is None or unit.unit_type == unit_type]
+        mobile_units.sort(key=lambda unit: (unit.y, unit.x))
+        return mobile_units
 
     def __resource_required(self, unit_type):
         return self.SP if is_stationary(unit_type) else self.MP
@@ -165,6 +370,10 @@ class GameState:
         held_resource = self.get_resource(resource_type, player_index)
         self._player_resources[player_index][resource_key] = held_resource + amount
 
+    def __check_writable(self, method_name):
+        if self._read_only:
+            raise RuntimeError("{} cannot be used on a mirrored view of a game state, since it would spend the real players' resources".format(method_name))
+
     def _invalid_player_index(self, index):
         self.warn("Invalid player index {} passed, player index should always be 0 (yourself) or 1 (your opponent)".format(index))
     
@@ -175,8 +384,9 @@ class GameState:
         """Submit and end your turn.
             Must be called at the end of your turn or the algo will hang.
         """
-        build_string = json.dumps(self._build_stack)
-        deploy_string = json.dumps(self._deploy_stack)
+        self.__check_writable("submit_turn")
+        build_string = json_dumps(self._build_stack)
+        deploy_string = json_dumps(self._deploy_stack)
         send_command(build_string)
         send_command(deploy_string)
 
@@ -363,7 +573,11 @@ class GameState:
         Returns:
             The number of units successfully spawned
 
+        Raises:
+            RuntimeError: If this game state is a mirrored view, see mirrored
+
         """
+        self.__check_writable("attempt_spawn")
         if unit_type not in ALL_UNITS:
             self._invalid_unit(unit_type)
             return
@@ -400,7 +614,11 @@ class GameState:
         Returns:
             The number of structures successfully flagged for removal
 
+        Raises:
+            RuntimeError: If this game state is a mirrored view, see mirrored
+
         """
+        self.__check_writable("attempt_remove")
         if type(locations[0]) == int:
             locations = [locations]
         removed_units = 0
@@ -422,7 +640,11 @@ class GameState:
         Returns:
             The number of units successfully upgraded
 
+        Raises:
+            RuntimeError: If this game state is a mirrored view, see mirrored
+
         """
+        self.__check_writable("attempt_upgrade")
 
         if type(locations[0]) == int:
             locations = [locations]
@@ -431,7 +653,8 @@ class GameState:
             if location[1] < self.HALF_ARENA and self.contains_stationary_unit(location):
                 x, y = map(int, location)
                 existing_unit = None
-                for unit in self.game_map[x,y]:
+                # The unit may be shared with a forked game state or a savepoint, which must not see the upgrade
+                for unit in self.game_map._detach_tile(x, y):
                     if unit.stationary:
                         existing_unit = unit
 
@@ -442,12 +665,158 @@ class GameState:
                         self.__set_resource(SP, 0 - costs[SP])
                         self.__set_resource(MP, 0 - costs[MP])
                         existing_unit.upgrade()
+                        self.game_map._update_tile(x, y)
                         self._build_stack.append((UPGRADE, x, y))
                         spawned_units += 1
             else:
                 self.warn("Could not upgrade a unit from {}. Location has no structures or is enemy territory.".format(location))
         return spawned_units
 
+    def fork(self):
+        """Creates a copy of this game state for exploring hypothetical boards.
+
+        The copy shares unchanged tiles and units with this game state, and only copies what gets
+        changed, so it is far cheaper than copy.deepcopy. Resources and the build and deploy stacks
+        are copied, so spawning, upgrading or removing on either state never affects the other.
+        Path caches are shared, since cached paths are keyed on the structure layout. The copy gets its own
+        pathfinder, starting with the same dynamic pathing setting and pathing stats, so use_dynamic_pathing
+        and enable_pathing_stats on either state never affect the other.
+
+        Returns:
+            A new GameState
+        """
+        child = copy.copy(self)
+        child.game_map = self.game_map.fork()
+        child._shortest_path_finder = ShortestPathFinder()
+        child._shortest_path_finder.dynamic = self._shortest_path_finder.dynamic
+        child._shortest_path_finder.dynamic_repair_limit = self._shortest_path_finder.dynamic_repair_limit
+        child._shortest_path_finder.stats = self._shortest_path_finder.stats
+        child._build_stack = list(self._build_stack)
+        child._deploy_stack = list(self._deploy_stack)
+        child._player_resources = [dict(resources) for resources in self._player_resources]
+        return child
+
+    def to_bytes(self):
+        """Encodes this game state in a compact binary form, for sending to worker processes or caching on disk.
+
+        The turn number, health, time and resources of each player, the build and deploy stacks and the units
+        on the map are kept. The config is not included, and the turn string is dropped.
+
+        Returns:
+            A bytes object that from_bytes turns back into a GameState
+        """
+        map_bytes = self.game_map.to_bytes()
+        header = _BYTES_HEADER.pack(
+            _BYTES_VERSION, self.turn_number, self.my_health, self.my_time, self.enemy_health, self.enemy_time,
+            self._player_resources[0]['SP'], self._player_resources[0]['MP'],
+            self._player_resources[1]['SP'], self._player_resources[1]['MP'],
+            len(self._build_stack), len(self._deploy_stack), len(map_bytes))
+        stacks = [_BYTES_STACK_ENTRY.pack(UNIT_TYPE_TO_INDEX[unit_type], x, y) for unit_type, x, y in self._build_stack + self._deploy_stack]
+        return header + b"".join(stacks) + map_bytes
+
+    @classmethod
+    def from_bytes(cls, data, config):
+        """Decodes a game state encoded by to_bytes
+
+        Args:
+            data: The bytes returned by to_bytes
+            config: The game config to attach to the state, its map and its units. It is shared, not copied
+
+        Returns:
+            A new GameState, or None if the data is not a valid encoding. Its serialized_string is None
+        """
+        state = cls(config, _EMPTY_TURN)
+        state.serialized_string = None
+        if len(data) < _BYTES_HEADER.size:
+            state.warn("Cannot decode a GameState from {} bytes".format(len(data)))
+            return None
+        (version, state.turn_number, state.my_health, state.my_time, state.enemy_health, state.enemy_time,
+            p1_SP, p1_MP, p2_SP, p2_MP, build_length, deploy_length, map_length) = _BYTES_HEADER.unpack_from(data)
+        stacks_end = _BYTES_HEADER.size + (build_length + deploy_length) * _BYTES_STACK_ENTRY.size
+        if version != _BYTES_VERSION or len(data) != stacks_end + map_length:
+            state.warn("Cannot decode a GameState, the data is from a different version or truncated")
+            return None
+
+        state._player_resources = [
+            {'SP': p1_SP, 'MP': p1_MP},
+            {'SP': p2_SP, 'MP': p2_MP}]
+        unit_information = config["unitInformation"]
+        stacks = [(unit_information[type_index]["shorthand"], x, y)
+                  for type_index, x, y in _BYTES_STACK_ENTRY.iter_unpack(data[_BYTES_HEADER.size:stacks_end])]
+        state._build_stack = stacks[:build_length]
+        state._deploy_stack = stacks[build_length:]
+        game_map = GameMap.from_bytes(data[stacks_end:], config)
+        if game_map is None:
+            return None
+        game_map.enable_warnings = state.enable_warnings
+        state.game_map = game_map
+        return state
+
+    def mirrored(self):
+        """Creates a view of this game state from the opponent's perspective.
+
+        Locations are mirrored top to bottom and player indices are swapped, so get_target_edge, find_path_to_edge,
+        find_paths_from_all_spawns, get_attackers and the other methods answer for the opponent as if they were player 0.
+        Health, time and resources are swapped too. No units are parsed or copied: the view reads the same map
+        and resources as this game state.
+
+        The view is read-only for turn actions. attempt_spawn, attempt_upgrade, attempt_remove and submit_turn raise
+        a RuntimeError on it, since they would spend the real players' resources. Hypothetical structures can still be
+        placed with game_map.add_unit, which changes this game state's map too, so undo them with savepoint and rollback.
+
+        Returns:
+            A GameState whose game_map is a MirroredGameMap. Calling mirrored on it gives back a read-only view matching this state
+        """
+        view = copy.copy(self)
+        view._read_only = True
+        view.game_map = self.game_map.mirrored()
+        view.my_health, view.enemy_health = self.enemy_health, self.my_health
+        view.my_time, view.enemy_time = self.enemy_time, self.my_time
+        view._player_resources = [self._player_resources[1], self._player_resources[0]]
+        view._build_stack = []
+        view._deploy_stack = []
+        return view
+
+    def savepoint(self):
+        """Marks a point that this game state can be returned to with rollback.
+
+        From the first savepoint until commit is called, changes to the map are recorded in an undo log.
+        This covers attempt_spawn, attempt_upgrade, attempt_remove and direct edits through game_map.add_unit
+        and game_map.remove_unit, along with resources and the build and deploy stacks.
+        Savepoints can be nested, so a search can try a plan, roll it back, and try the next.
+
+        Returns:
+            A savepoint to pass to rollback
+        """
+        return (self.game_map.savepoint(), [dict(resources) for resources in self._player_resources],
+                len(self._build_stack), len(self._deploy_stack))
+
+    def rollback(self, savepoint):
+        """Undoes every change made since a savepoint was created.
+
+        This takes time proportional to the number of changes made. Units upgraded since the savepoint are
+        replaced by their state at the savepoint, so references to them taken after the savepoint are stale.
+
+        Args:
+            savepoint: A savepoint returned by savepoint since the last commit
+
+        Returns:
+            True if the game state was rolled back. False if the savepoint was already committed or rolled back past,
+            in which case nothing is changed
+        """
+        map_savepoint, player_resources, build_length, deploy_length = savepoint
+        if not self.game_map.rollback(map_savepoint):
+            return False
+        self._player_resources = [dict(resources) for resources in player_resources]
+        del self._build_stack[build_length:]
+        del self._deploy_stack[deploy_length:]
+        return True
+
+    def commit(self):
+        """Keeps every change made since the first open savepoint and stops recording changes.
+        """
+        self.game_map.commit()
+
     def get_target_edge(self, start_location):
         """Gets the target edge given a starting location
 
@@ -481,7 +850,8 @@ class GameState:
 
         Returns:
             A list of locations corresponding to the path the unit would take 
-            to get from it's starting location to the best available end location
+            to get from it's starting location to the best available end location.
+            Paths are cached until the structure layout changes.
 
         """
         if self.contains_stationary_unit(start_location):
@@ -491,8 +861,118 @@ class GameState:
         if target_edge is None:
             target_edge = self.get_target_edge(start_location)
 
-        end_points = self.game_map.get_edge_locations(target_edge)
-        return self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
+        blocked_locations = self.game_map.get_blocked_locations()
+        path = self._path_cache.get(blocked_locations, start_location, target_edge)
+        if path is None:
+            end_points = self.game_map.get_edge_locations(target_edge)
+            path = self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
+            self._path_cache.put(blocked_locations, start_location, target_edge, path)
+        return path
+
+    def find_paths_from_all_spawns(self, player_index=0):
+        """Gets the path a mobile unit would take from every location the given player can deploy it at.
+        This shares the pathfinding work between all of the starting locations, so it is much faster
+        than calling find_path_to_edge for each of them.
+
+        Args:
+            player_index: The index corresponding to the deploying player, 0 for you 1 for the enemy
+
+        Returns:
+            A dict mapping each unblocked edge location of the player, as an (x, y) tuple,
+            to the path a unit deployed there would take
+
+        """
+        if not player_index == 0 and not player_index == 1:
+            self._invalid_player_index(player_index)
+            return
+
+        return self.__spawn_paths(player_index, self.game_map.get_blocked_locations())
+
+    def __spawn_paths(self, player_index, blocked_locations, use_cache=True):
+        """
+        Helper function for find_paths_from_all_spawns and evaluate_placements.
+        Paths from each unblocked spawn location of a player, treating blocked_locations as the structure layout.
+        Hypothetical layouts pass use_cache=False, so their paths don't evict the paths cached for the real board.
+        """
+        if player_index == 0:
+            spawn_edges = [self.game_map.BOTTOM_LEFT, self.game_map.BOTTOM_RIGHT]
+        else:
+            spawn_edges = [self.game_map.TOP_LEFT, self.game_map.TOP_RIGHT]
+
+        paths = {}
+        for spawn_edge in spawn_edges:
+            edge_locations = self.game_map.get_edge_locations(spawn_edge)
+            target_edge = self.get_target_edge(edge_locations[0])
+            uncached = []
+            for location in edge_locations:
+                if tuple(location) in blocked_locations:
+                    continue
+                path = self._path_cache.get(blocked_locations, location, target_edge) if use_cache else None
+                if path is None:
+                    uncached.append(location)
+                else:
+                    paths[tuple(location)] = path
+
+            if uncached:
+                end_points = self.game_map.get_edge_locations(target_edge)
+                new_paths = self._shortest_path_finder.navigate_from_multiple_starts(uncached, end_points, self, blocked_locations)
+                for location, path in zip(uncached, new_paths):
+                    if use_cache:
+                        self._path_cache.put(blocked_locations, location, target_edge, path)
+                    paths[tuple(location)] = path
+        return paths
+
+    def evaluate_placements(self, locations):
+        """Reports how each player's attack paths would change if a structure was placed at each candidate location.
+        The game_map is not modified. Each candidate is pathed as an overlay on the current structure layout,
+        so this is much faster than adding and removing units on a copy of the map.
+
+        Args:
+            locations: A list of candidate locations for a new structure
+
+        Returns:
+            A list with one entry per candidate location, in the same order. Each entry is a dict mapping each
+            player index (0 or 1) to the spawn locations of that player whose path would change, keyed by (x, y) tuple.
+            Each spawn location maps to a (before, after) pair of [path_length, end_location, self_destructs] lists,
+            where path_length is the number of steps taken. after is None if the candidate blocks the spawn location.
+            Candidates outside the arena or already holding a structure get None.
+
+        """
+        blocked_locations = self.game_map.get_blocked_locations()
+        dynamic = self._shortest_path_finder.dynamic
+        #Neighbouring candidates only differ by a couple of tiles, so repairing the edge distance fields is cheaper than rebuilding them
+        self._shortest_path_finder.dynamic = True
+        try:
+            baseline = [self.__summarize_spawn_paths(player_index, blocked_locations) for player_index in [0, 1]]
+
+            results = []
+            for location in locations:
+                if not self.game_map.in_arena_bounds(location) or tuple(location) in blocked_locations:
+                    self.warn("Cannot evaluate a placement at {}. Location is invalid or blocked.".format(location))
+                    results.append(None)
+                    continue
+
+                overlay = blocked_locations | {tuple(location)}
+                changes = {}
+                for player_index in [0, 1]:
+                    after = self.__summarize_spawn_paths(player_index, overlay, False)
+                    changes[player_index] = {spawn: (before, after.get(spawn))
+                                             for spawn, before in baseline[player_index].items() if not after.get(spawn) == before}
+                results.append(changes)
+        finally:
+            self._shortest_path_finder.dynamic = dynamic
+        return results
+
+    def __summarize_spawn_paths(self, player_index, blocked_locations, use_cache=True):
+        """
+        Helper function for evaluate_placements. Summarizes each spawn path as [path_length, end_location, self_destructs].
+        """
+        summaries = {}
+        for spawn, path in self.__spawn_paths(player_index, blocked_locations, use_cache).items():
+            target_edge = self.get_target_edge(spawn)
+            self_destructs = path[-1] not in self.game_map.get_edge_locations(target_edge)
+            summaries[spawn] = [len(path) - 1, path[-1], self_destructs]
+        return summaries
 
     def contains_stationary_unit(self, location):
         """Check if a location is blocked, return structures unit if it is
@@ -529,7 +1009,58 @@ class GameState:
         """
 
         self.enable_warnings = not suppress
-        self.game_map.enable_warnings = not suppress
+        self._game_map.enable_warnings = not suppress
+
+    def get_pathlength_field(self, target_edge):
+        """Gets the number of steps from every tile to the given edge. Requires numpy.
+        These are the pathlengths a unit follows once its pocket of pathable space can reach the edge,
+        so the whole field can be scored with vectorized operations instead of pathing from each tile.
+
+        Args:
+            target_edge: The edge to measure the distance to. game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, etc.
+
+        Returns:
+            A 28x28 numpy int array indexed as field[x, y]. Tiles that are blocked, outside of the arena,
+            or cannot reach the edge are -1.
+
+        """
+        if np is None:
+            self.warn("get_pathlength_field requires numpy, which could not be imported")
+            return
+        end_points = self.game_map.get_edge_locations(target_edge)
+        if end_points is None:
+            return
+
+        pathlengths = self._shortest_path_finder.get_edge_pathlengths(end_points, self)
+        return np.array(pathlengths, dtype=int).reshape(self.ARENA_SIZE, self.ARENA_SIZE)
+
+    def use_dynamic_pathing(self, dynamic):
+        """Keep edge distance fields between path queries and repair them locally after structure edits.
+        This makes repeatedly adding or removing a single structure with game_map.add_unit and
+        game_map.remove_unit, then pathing again, much faster. Paths are unchanged.
+
+        Args:
+            dynamic: If true, enable dynamic pathing. If false, disable it.
+
+        """
+        self._shortest_path_finder.dynamic = dynamic
+
+    def enable_pathing_stats(self, stats=None):
+        """Start counting the work done by pathfinding calls on this game state.
+        Call stats.write_report() or stats.dump_json(file_path) once per turn to see where pathing time goes.
+
+        Args:
+            stats: An existing PathfindingStats to keep adding to, for example one kept between turns. A new one is created if None.
+
+        Returns:
+            The PathfindingStats object being updated
+
+        """
+        if stats is None:
+            stats = PathfindingStats()
+        stats.cache = self._path_cache
+        self._shortest_path_finder.stats = stats
+        return stats
 
     def get_target(self, attacking_unit):
         """Returns target of given unit based on current map of the game board. 
@@ -0,0 +1,175 @@
+"""
+A benchmark of the json codecs that gamelib can use to decode engine messages, see util.set_json_codec.
+
+Each importable codec decodes and encodes the same action frames, and its throughput is reported
+in frames per second. Every codec must decode the frames to the same data as the standard library,
+otherwise an AssertionError is raised. Frames are read from a replay file, or generated from random
+structure layouts if no replay is given.
+
+Run it from the python-algo folder with::
+
+    python -m gamelib.json_benchmark --replay path/to/game.replay
+
+"""
+import argparse
+import json
+import random
+import time
+
+from .pathfinding_harness import DEFAULT_CONFIG_PATH, DEFAULT_DENSITIES, random_layout
+from .util import JSON_CODECS, debug_write
+
+FRAMES_PER_TURN = 50
+
+
+def load_frames(replay_path):
+    """Reads the action frames of a replay file
+
+    Args:
+        * replay_path: The path to a replay file, which holds one engine message per line
+
+    Returns:
+        A list of the action frame messages, as strings
+    """
+    frames = []
+    with open(replay_path) as replay_file:
+        for line in replay_file:
+            line = line.strip()
+            if "turnInfo" not in line:
+                continue
+            if int(json.loads(line)["turnInfo"][0]) == 1:
+                frames.append(line)
+    return frames
+
+
+def record_frames(config, frames=200, seed=0, mobile_units=40):
+    """Generates action frames shaped like the engine's, for benchmarking without a replay file
+
+    Every FRAMES_PER_TURN frames a new random structure layout is created. Each frame lists the
+    structures and mobile units of both players, with a move event for every mobile unit and
+    attack and damage events against random structures.
+
+    Args:
+        * config: A json object containing information about the game
+        * frames: The number of frames to generate
+        * seed: The seed of the random frames, the same seed always produces the same frames
+        * mobile_units: The number of mobile units on the board in each frame
+
+    Returns:
+        A list of the action frame messages, as strings
+    """
+    rng = random.Random(seed)
+    unit_information = config["unitInformation"]
+    type_indices = {info["shorthand"]: index for index, info in enumerate(unit_information)}
+    messages = []
+    for frame in range(frames):
+        if frame % FRAMES_PER_TURN == 0:
+            game_state = random_layout(config, rng, rng.choice(DEFAULT_DENSITIES))
+            structures = list(game_state.game_map.iter_structures())
+            edges = game_state.game_map.get_edges()
+            movers = []
+            for unit_id in range(mobile_units):
+                player_index = unit_id % 2
+                edge = edges[rng.choice((2, 3)) if player_index == 0 else rng.choice((0, 1))]
+                movers.append([player_index, rng.randrange(3, 6), list(rng.choice(edge)), str(1000 + unit_id)])
+
+        player_units = [[[] for _ in unit_information], [[] for _ in unit_information]]
+        events = {"selfDestruct": [], "breach": [], "damage": [], "shield": [], "move": [], "spawn": [], "death": [], "attack": [], "melee": []}
+        for structure in structures:
+            player_units[structure.player_index][type_indices[structure.unit_type]].append(
+                [structure.x, structure.y, structure.health, str(structure.x * game_state.ARENA_SIZE + structure.y)])
+        for mover in movers:
+            player_index, type_index, location, unit_id = mover
+            previous = list(location)
+            location[0] = min(max(location[0] + rng.choice((-1, 0, 1)), 0), game_state.ARENA_SIZE - 1)
+            location[1] = min(max(location[1] + (1 if player_index == 0 else -1), 0), game_state.ARENA_SIZE - 1)
+            player_units[player_index][type_index].append([location[0], location[1], float(rng.randrange(5, 40)), unit_id])
+            events["move"].append([previous, list(location), [0, 0], type_index, unit_id, player_index + 1])
+            if structures:
+                target = rng.choice(structures)
+                damage = float(rng.randrange(1, 20))
+                events["attack"].append([list(location), [target.x, target.y], damage, type_index, unit_id, str(target.x * game_state.ARENA_SIZE + target.y), player_index + 1])
+                events["damage"].append([[target.x, target.y], damage, type_indices[target.unit_type], str(target.x * game_state.ARENA_SIZE + target.y), target.player_index + 1])
+
+        message = {
+            "p1Units": player_units[0],
+            "p2Units": player_units[1],
+            "turnInfo": [1, frame // FRAMES_PER_TURN, frame % FRAMES_PER_TURN],
+            "p1Stats": [30.0, 12.5, 8.0, 1200],
+            "p2Stats": [28.0, 9.0, 11.5, 1500],
+            "events": events,
+        }
+        messages.append(json.dumps(message, separators=(",", ":")))
+    return messages
+
+
+def run_benchmark(frames, codecs=None, repeat=5):
+    """Decodes and encodes the frames with each codec
+
+    Args:
+        * frames: A list of action frame messages, as strings
+        * codecs: The names of the codecs to benchmark, see util.JSON_CODECS. All importable codecs by default
+        * repeat: The number of timed passes over the frames. The fastest pass is reported
+
+    Returns:
+        A dict mapping each codec name to a dict of its decoded and encoded frames per second
+
+    Raises:
+        AssertionError: If a codec decodes a frame differently from the standard library
+    """
+    if codecs is None:
+        codecs = list(JSON_CODECS)
+    expected = [json.loads(frame) for frame in frames]
+    results = {}
+    for name in codecs:
+        loads, dumps = JSON_CODECS[name]
+        decoded = [loads(frame) for frame in frames]
+        if decoded != expected:
+            raise AssertionError("Codec {} decodes frames differently from the standard library".format(name))
+
+        decode_time = encode_time = float("inf")
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            for frame in frames:
+                loads(frame)
+            decode_time = min(decode_time, time.perf_counter() - start_time)
+            start_time = time.perf_counter()
+            for data in decoded:
+                dumps(data)
+            encode_time = min(encode_time, time.perf_counter() - start_time)
+
+        results[name] = {
+            "decode_frames_per_second": len(frames) / decode_time if decode_time > 0 else 0.0,
+            "encode_frames_per_second": len(frames) / encode_time if encode_time > 0 else 0.0,
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the throughput of each importable json codec on action frames.")
+    parser.add_argument("--replay", help="Path to a replay file to read action frames from. Frames are generated if not given")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Path to the game config json, used to generate frames")
+    parser.add_argument("--frames", type=int, default=200, help="Number of frames to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated frames")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed passes over the frames")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        frames = load_frames(args.replay)
+    else:
+        with open(args.config) as config_file:
+            config = json.load(config_file)
+        frames = record_frames(config, args.frames, args.seed)
+    if not frames:
+        debug_write("No action frames to benchmark")
+        return None
+
+    results = run_benchmark(frames, repeat=args.repeat)
+    debug_write("Benchmarked {} frames, {:.0f} bytes each on average".format(len(frames), sum(map(len, frames)) / len(frames)))
+    for name, result in results.items():
+        debug_write("{}: decode {:.0f} frames/s, encode {:.0f} frames/s".format(name, result["decode_frames_per_second"], result["encode_frames_per_second"]))
+    return results
+
+
+if __name__ == "__main__":
+    main()
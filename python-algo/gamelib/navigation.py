@@ -1,24 +1,206 @@
 import heapq
-import math
 import sys
-import queue
-from .util import debug_write
+import time
+from collections import deque, OrderedDict
+from .game_map import ARENA_SIZE, ARENA_MASK
+from .util import debug_write, json_dumps
 
-class Node:
-    """A pathfinding node
+TILE_COUNT = ARENA_SIZE * ARENA_SIZE
+
+_COORDS = None
+_NEIGHBORS = None
+_IDEALNESS_TABLES = {}
+_NO_TILES = bytes(TILE_COUNT)
+_UNSET_PATHLENGTHS = [-1] * TILE_COUNT
+_UNLABELLED = [0] * TILE_COUNT
+
+
+def _build_tables(game_map):
+    """Precomputes the coordinates and in-arena neighbors of every tile.
+
+    Tiles are stored in flat arrays indexed by x * ARENA_SIZE + y. Neighbors are
+    listed in the order up, down, right, left, which is the order the pathfinder
+    has always considered them in.
+    """
+    global _COORDS, _NEIGHBORS
+    coords = []
+    neighbors = []
+    for index in range(TILE_COUNT):
+        x, y = divmod(index, ARENA_SIZE)
+        coords.append((x, y))
+        adjacent = []
+        if ARENA_MASK[x][y]:
+            for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= nx < ARENA_SIZE and 0 <= ny < ARENA_SIZE and ARENA_MASK[nx][ny]:
+                    adjacent.append(nx * ARENA_SIZE + ny)
+        neighbors.append(tuple(adjacent))
+    _COORDS = tuple(coords)
+    _NEIGHBORS = tuple(neighbors)
+    for edge in game_map.get_edges():
+        _get_idealness_table(edge)
+
+
+def _get_idealness_table(end_points):
+    """Gets the idealness of every tile for a set of endpoints, computing it the first time it is needed.
+
+    Tables for the four edges are built with the neighbor tables, in GameMap.get_edges order, so in practice
+    they are computed once per game. The endpoints are pre-marked as perfectly ideal.
+
+    Returns:
+        A flat list indexed by x * ARENA_SIZE + y
+    """
+    end_indices = tuple(x * ARENA_SIZE + y for x, y in end_points)
+    table = _IDEALNESS_TABLES.get(end_indices)
+    if table is None:
+        edge_x, edge_y = end_points[0]
+        right = edge_x >= ARENA_SIZE // 2
+        top = edge_y >= ARENA_SIZE // 2
+        table = [28 * (y if top else 27 - y) + (x if right else 27 - x) for x, y in _COORDS]
+        for index in end_indices:
+            table[index] = sys.maxsize
+        _IDEALNESS_TABLES[end_indices] = table
+    return table
+
+class PathCache:
+    """A bounded least recently used cache of paths
+
+    Paths are keyed on the set of blocked locations, the start location and the target edge.
+    Placing or removing a structure changes the blocked set, so a cached path is never
+    returned for a structure layout it was not computed on.
 
     Attributes :
-        * visited_idealness (bool): Have we visited this node during the idealness search step?
-        * visited_validate (bool): Have we visited this node during the validation step?
-        * blocked (bool): Is there a structures at this node's location
-        * pathlength: The distance between this node and the target location
+        * max_size (int): The number of paths kept before the least recently used one is evicted
+        * hits (int): The number of lookups that found a cached path
+        * misses (int): The number of lookups that did not
 
     """
-    def __init__(self):
-        self.visited_idealness = False
-        self.visited_validate = False
-        self.blocked = False
-        self.pathlength = -1
+    def __init__(self, max_size=2048):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._paths = OrderedDict()
+
+    def get(self, blocked_locations, start_location, target_edge):
+        """Looks up a cached path
+
+        Args:
+            * blocked_locations: A frozenset of the blocked locations, see GameMap.get_blocked_locations
+            * start_location: The starting location of the unit
+            * target_edge: The edge the unit wants to reach
+
+        Returns:
+            A copy of the cached path, or None if it is not cached
+
+        """
+        key = (blocked_locations, tuple(start_location), target_edge)
+        path = self._paths.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._paths.move_to_end(key)
+        return [list(location) for location in path]
+
+    def put(self, blocked_locations, start_location, target_edge, path):
+        """Stores a path, evicting the least recently used path if the cache is full
+
+        """
+        key = (blocked_locations, tuple(start_location), target_edge)
+        self._paths[key] = tuple(tuple(location) for location in path)
+        self._paths.move_to_end(key)
+        if len(self._paths) > self.max_size:
+            self._paths.popitem(last=False)
+
+    def clear(self):
+        """Removes every cached path
+
+        """
+        self._paths.clear()
+
+    def __len__(self):
+        return len(self._paths)
+
+class PathfindingStats:
+    """Opt-in counters describing the work done by a ShortestPathFinder
+
+    Attributes :
+        * calls (int): The number of pathfinding calls made
+        * paths (int): The number of paths produced
+        * path_steps (int): The total number of steps in the produced paths
+        * idealness_expansions (int): Tiles expanded while searching pockets for their most ideal tile
+        * validate_expansions (int): Tiles expanded while computing pathlengths
+        * total_time (float): Seconds spent in pathfinding calls
+        * max_time (float): Seconds spent in the slowest call
+        * cache (:obj: PathCache): The path cache to report hit rates for, or None
+
+    """
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.reset()
+
+    def reset(self):
+        """Zeroes every counter, for example at the start of a turn
+
+        """
+        self.calls = 0
+        self.paths = 0
+        self.path_steps = 0
+        self.idealness_expansions = 0
+        self.validate_expansions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record_call(self, seconds):
+        """Records the wall clock time of one pathfinding call
+
+        """
+        self.calls += 1
+        self.total_time += seconds
+        if seconds > self.max_time:
+            self.max_time = seconds
+
+    def as_dict(self):
+        """Gets a summary of the counters
+
+        Returns:
+            A dict of the counters, with averages and the cache hit rate if a cache is attached
+
+        """
+        summary = {
+            "calls": self.calls,
+            "paths": self.paths,
+            "mean_path_length": self.path_steps / self.paths if self.paths else 0,
+            "idealness_expansions": self.idealness_expansions,
+            "validate_expansions": self.validate_expansions,
+            "total_ms": self.total_time * 1000,
+            "mean_ms": self.total_time * 1000 / self.calls if self.calls else 0,
+            "max_ms": self.max_time * 1000
+        }
+        if self.cache is not None:
+            lookups = self.cache.hits + self.cache.misses
+            summary["cache_hits"] = self.cache.hits
+            summary["cache_misses"] = self.cache.misses
+            summary["cache_hit_rate"] = self.cache.hits / lookups if lookups else 0
+        return summary
+
+    def write_report(self):
+        """Prints a one line summary of the counters to the games debug output
+
+        """
+        debug_write("Pathing: " + ", ".join("{} {}".format(key, round(value, 3)) for key, value in self.as_dict().items()))
+
+    def dump_json(self, file_path, **extra):
+        """Appends the summary as one line of JSON to a file
+
+        Args:
+            * file_path: The file to append to
+            * extra: Additional fields to include, such as turn_number
+
+        """
+        summary = self.as_dict()
+        summary.update(extra)
+        with open(file_path, "a") as stats_file:
+            stats_file.write(json_dumps(summary) + "\n")
 
 """
 This class helps with pathfinding. We guarantee the results will
@@ -28,18 +210,41 @@ code to maximise time efficiency
 class ShortestPathFinder:
     """Handles pathfinding
 
+    The pathfinding state is kept in flat arrays indexed by x * ARENA_SIZE + y.
+    The arrays are allocated once and reused by every call.
+
     Attributes :
         * HORIZONTAL (int): A constant representing a horizontal movement
         * VERTICAL (int): A constant representing a vertical movement
 
         * game_state (:obj: GameState): The current gamestate
-        * game_map (:obj: GameMap): The current gamemap
+        * blocked_locations (frozenset): The locations treated as blocked by the current search
+        * blocked (bytearray): 1 for each tile holding a structure
+        * visited_validate (bytearray): 1 for each tile visited during the validation step
+        * pathlength (list): The distance between each tile and the target location, -1 if unvisited
+        * pocket_labels (list): The label of the pocket of pathable space each tile belongs to, 0 if unlabelled.
+          Labels are kept until the blocked locations change, so repeated queries skip the flood fill
+        * dynamic (bool): If True, the distance field to each set of endpoints is kept between calls and repaired
+          locally when only a few structures were placed or removed since it was computed
+        * dynamic_repair_limit (int): The most structure changes repaired locally before a distance field is rebuilt
+        * stats (:obj: PathfindingStats): If set, counters are updated by every call. None by default
 
     """
     def __init__(self):
         self.HORIZONTAL = 1
         self.VERTICAL = 2
         self.initialized = False
+        self.blocked = bytearray(TILE_COUNT)
+        self.visited_validate = bytearray(TILE_COUNT)
+        self.pathlength = list(_UNSET_PATHLENGTHS)
+        self.pocket_labels = list(_UNLABELLED)
+        self._pocket_board = None
+        self._pocket_tiles = [None]
+        self._pocket_ideals = {}
+        self.dynamic = False
+        self.dynamic_repair_limit = 16
+        self._edge_fields = {}
+        self.stats = None
 
     def initialize_map(self, game_state):
         """Initializes the map
@@ -48,9 +253,14 @@ class ShortestPathFinder:
             game_state: A GameState object representing the gamestate we want to traverse
         """
         #Initialize map 
+        if _NEIGHBORS is None:
+            _build_tables(game_state.game_map)
         self.initialized = True
         self.game_state = game_state
-        self.game_map = [[Node() for x in range(self.game_state.ARENA_SIZE)] for y in range(self.game_state.ARENA_SIZE)]
+        self.blocked_locations = game_state.game_map.get_blocked_locations()
+        self.blocked[:] = _NO_TILES
+        self.visited_validate[:] = _NO_TILES
+        self.pathlength[:] = _UNSET_PATHLENGTHS
 
     def navigate_multiple_endpoints(self, start_point, end_points, game_state):
         """Finds the path a unit would take to reach a set of endpoints
@@ -65,49 +275,301 @@ class ShortestPathFinder:
             Note that this path can change if a tower is destroyed during pathing, or if you or your enemy places structures.
 
         """
+        if self.stats is None:
+            return self._navigate(start_point, end_points, game_state)
+        start_time = time.perf_counter()
+        path = self._navigate(start_point, end_points, game_state)
+        self.stats.record_call(time.perf_counter() - start_time)
+        return path
+
+    def _navigate(self, start_point, end_points, game_state):
         if game_state.contains_stationary_unit(start_point):
             return
 
         #Initialize map 
         self.initialize_map(game_state)
-        #Fill in walls
-        for location in self.game_state.game_map:
-            if self.game_state.contains_stationary_unit(location):
-                self.game_map[location[0]][location[1]].blocked = True
+        if self.dynamic:
+            #A unit whose pocket reaches the edge follows the endpoint distance field
+            self._load_edge_field(end_points)
+            if self.pathlength[start_point[0] * ARENA_SIZE + start_point[1]] >= 0:
+                return self._get_path(start_point, end_points)
+            self.initialize_map(game_state)
+        self._fill_walls()
         #Do pathfinding
         ideal_endpoints = self._idealness_search(start_point, end_points)
         self._validate(ideal_endpoints, end_points)
         return self._get_path(start_point, end_points)
 
-    def _idealness_search(self, start, end_points):
+    def navigate_from_multiple_starts(self, start_points, end_points, game_state, blocked_locations=None):
+        """Finds the paths units at several starting locations would take to reach the same set of endpoints
+
+        Each pocket of pathable space is searched once, and starts whose pockets share a most ideal
+        tile share a single validation pass, so this is much cheaper than pathing from each start separately.
+
+        Args:
+            * start_points: The starting locations of the units
+            * end_points: The end points of the units, should be a list of edge locations
+            * game_state: The current game state
+            * blocked_locations: A frozenset of (x, y) locations to treat as blocked instead of the structures on the game map
+
+        Returns:
+            A list with the path for each start point, in the same order. Blocked start points get None.
+
         """
-        Finds the most ideal tile in our 'pocket' of pathable space. 
-        The edge if it is available, or the best self destruct location otherwise
+        if self.stats is None:
+            return self._navigate_from_multiple_starts(start_points, end_points, game_state, blocked_locations)
+        start_time = time.perf_counter()
+        paths = self._navigate_from_multiple_starts(start_points, end_points, game_state, blocked_locations)
+        self.stats.record_call(time.perf_counter() - start_time)
+        return paths
+
+    def _navigate_from_multiple_starts(self, start_points, end_points, game_state, blocked_locations):
+        self.initialize_map(game_state)
+        if blocked_locations is not None:
+            self.blocked_locations = blocked_locations
+        self._fill_walls()
+        blocked = self.blocked
+
+        #Group the starts by the tile their pocket will path towards
+        groups = {}
+        for position, start_point in enumerate(start_points):
+            if blocked[start_point[0] * ARENA_SIZE + start_point[1]]:
+                continue
+            ideal_tile = self._idealness_search(start_point, end_points)
+            #Every pocket that reaches the edge shares the same validation pass
+            group_key = None if ideal_tile in end_points else tuple(ideal_tile)
+            groups.setdefault(group_key, (ideal_tile, []))[1].append(position)
+
+        paths = [None] * len(start_points)
+        for group_key, (ideal_tile, positions) in groups.items():
+            if group_key is None and self.dynamic:
+                self._load_edge_field(end_points)
+            else:
+                self.visited_validate[:] = _NO_TILES
+                self.pathlength[:] = _UNSET_PATHLENGTHS
+                self._validate(ideal_tile, end_points)
+            for position in positions:
+                paths[position] = self._get_path(start_points[position], end_points)
+        return paths
+
+    def get_edge_pathlengths(self, end_points, game_state):
+        """Gets the distance from every tile to the nearest reachable endpoint
+
+        Args:
+            * end_points: The end points to measure the distance to, should be a list of edge locations
+            * game_state: The current game state
+
+        Returns:
+            A flat list indexed by x * ARENA_SIZE + y holding the pathlength of each tile.
+            Tiles that are blocked, outside of the arena, or in pockets that cannot reach the endpoints are -1.
+
         """
-        current = queue.Queue()
-        current.put(start)
-        best_idealness = self._get_idealness(start, end_points)
-        self.game_map[start[0]][start[1]].visited_idealness = True
-        most_ideal = start
-
-        while not current.empty():
-            search_location = current.get()
-            for neighbor in self._get_neighbors(search_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
-                    continue
+        start_time = time.perf_counter()
+        self.initialize_map(game_state)
+        self._load_edge_field(end_points)
+        pathlengths = list(self.pathlength)
+        for x, y in self.blocked_locations:
+            pathlengths[x * ARENA_SIZE + y] = -1
+        if self.stats is not None:
+            self.stats.record_call(time.perf_counter() - start_time)
+        return pathlengths
+
+    def _load_edge_field(self, end_points):
+        """Loads the pathlength field produced by validating from every endpoint into the blocked and pathlength arrays.
+
+        In dynamic mode the field from the previous call is kept for each set of endpoints. If only a few
+        structures changed since then, it is repaired one tile at a time instead of being recomputed.
+        """
+        blocked_locations = self.blocked_locations
+        end_indices = tuple(x * ARENA_SIZE + y for x, y in end_points)
+        field = self._edge_fields.get(end_indices)
+        if field is not None:
+            field_blocked_locations, field_blocked, field_pathlength = field
+            newly_blocked = blocked_locations - field_blocked_locations
+            newly_unblocked = field_blocked_locations - blocked_locations
+            if len(newly_blocked) + len(newly_unblocked) > self.dynamic_repair_limit:
+                field = None
+
+        if field is None:
+            self.blocked[:] = _NO_TILES
+            self._fill_walls()
+            self.visited_validate[:] = _NO_TILES
+            self.pathlength[:] = _UNSET_PATHLENGTHS
+            self._validate(end_points[0], end_points)
+        else:
+            self.blocked[:] = field_blocked
+            self.pathlength[:] = field_pathlength
+            end_set = set(end_indices)
+            for x, y in newly_unblocked:
+                self._repair_unblocked(x * ARENA_SIZE + y, end_set)
+            for x, y in newly_blocked:
+                self._repair_blocked(x * ARENA_SIZE + y, end_set)
+        self._edge_fields[end_indices] = (blocked_locations, bytes(self.blocked), list(self.pathlength))
+
+    def _repair_blocked(self, index, end_indices):
+        """Updates the pathlength field after a structure is placed on a tile
+
+        Only the tiles whose every shortest route ran through the new structure are recomputed.
+        """
+        blocked = self.blocked
+        pathlength = self.pathlength
+        if blocked[index]:
+            return
+        blocked[index] = 1
+        old_pathlength = pathlength[index]
+        #Blocked endpoints keep the pathlength _validate seeds them with
+        pathlength[index] = 0 if index in end_indices else -1
+        if old_pathlength < 0:
+            return
 
-                x, y = neighbor
-                current_idealness = self._get_idealness(neighbor, end_points)
+        #Walk outwards in order of pathlength, collecting tiles that lost all of their shorter neighbors
+        orphaned = set()
+        checked = set()
+        current = deque(neighbor for neighbor in _NEIGHBORS[index] if not blocked[neighbor] and pathlength[neighbor] == old_pathlength + 1)
+        while current:
+            tile = current.popleft()
+            if tile in checked:
+                continue
+            checked.add(tile)
+            tile_pathlength = pathlength[tile]
+            supported = False
+            for neighbor in _NEIGHBORS[tile]:
+                if not blocked[neighbor] and pathlength[neighbor] == tile_pathlength - 1 and neighbor not in orphaned:
+                    supported = True
+                    break
+            if supported:
+                continue
+            orphaned.add(tile)
+            for neighbor in _NEIGHBORS[tile]:
+                if not blocked[neighbor] and pathlength[neighbor] == tile_pathlength + 1:
+                    current.append(neighbor)
+
+        #Settle the orphaned tiles again from the unaffected tiles around them
+        for tile in orphaned:
+            pathlength[tile] = -1
+        frontier = []
+        for tile in orphaned:
+            best = -1
+            for neighbor in _NEIGHBORS[tile]:
+                if not blocked[neighbor] and neighbor not in orphaned and pathlength[neighbor] >= 0:
+                    if best < 0 or pathlength[neighbor] + 1 < best:
+                        best = pathlength[neighbor] + 1
+            if best >= 0:
+                frontier.append((best, tile))
+        heapq.heapify(frontier)
+        while frontier:
+            tile_pathlength, tile = heapq.heappop(frontier)
+            if pathlength[tile] >= 0:
+                continue
+            pathlength[tile] = tile_pathlength
+            for neighbor in _NEIGHBORS[tile]:
+                if neighbor in orphaned and pathlength[neighbor] < 0:
+                    heapq.heappush(frontier, (tile_pathlength + 1, neighbor))
+
+    def _repair_unblocked(self, index, end_indices):
+        """Updates the pathlength field after the structure on a tile is removed
+
+        Only the tiles that the opened tile gives a shorter route are updated.
+        """
+        blocked = self.blocked
+        pathlength = self.pathlength
+        if not blocked[index]:
+            return
+        blocked[index] = 0
+        if index in end_indices:
+            pathlength[index] = 0
+        else:
+            best = -1
+            for neighbor in _NEIGHBORS[index]:
+                if not blocked[neighbor] and pathlength[neighbor] >= 0:
+                    if best < 0 or pathlength[neighbor] + 1 < best:
+                        best = pathlength[neighbor] + 1
+            pathlength[index] = best
+            if best < 0:
+                return
+
+        current = deque((index,))
+        while current:
+            tile = current.popleft()
+            next_pathlength = pathlength[tile] + 1
+            for neighbor in _NEIGHBORS[tile]:
+                if not blocked[neighbor] and (pathlength[neighbor] < 0 or pathlength[neighbor] > next_pathlength):
+                    pathlength[neighbor] = next_pathlength
+                    current.append(neighbor)
+
+    def _fill_walls(self):
+        """Marks every location holding a structure as blocked
+        """
+        blocked = self.blocked
+        for x, y in self.blocked_locations:
+            blocked[x * ARENA_SIZE + y] = 1
+
+    def _reset_pockets(self):
+        """Discards the pocket labels when the blocked locations differ from the ones they were computed for
+        """
+        if self._pocket_board != self.blocked_locations:
+            self._pocket_board = self.blocked_locations
+            self.pocket_labels[:] = _UNLABELLED
+            del self._pocket_tiles[1:]
+            self._pocket_ideals.clear()
+
+    def _label_pocket(self, start_index, label):
+        """Flood fills the pocket of pathable space around a tile, marking each tile with the given label
 
-                if current_idealness > best_idealness:
-                    best_idealness = current_idealness
-                    most_ideal = neighbor
+        Returns:
+            The indices of the tiles in the pocket
+        """
+        blocked = self.blocked
+        labels = self.pocket_labels
+        labels[start_index] = label
+        pocket_tiles = [start_index]
+        for tile in pocket_tiles:
+            for neighbor in _NEIGHBORS[tile]:
+                if not labels[neighbor] and not blocked[neighbor]:
+                    labels[neighbor] = label
+                    pocket_tiles.append(neighbor)
+        if self.stats is not None:
+            self.stats.idealness_expansions += len(pocket_tiles)
+        return pocket_tiles
+
+    def _most_ideal_tile(self, pocket_tiles, end_points):
+        """Finds the most ideal tile of a pocket, matching the result of _idealness_search for any start in the pocket
+
+        Idealness is unique to each tile apart from the endpoints, and every reachable endpoint is treated the same way by _validate.
+        """
+        idealness_table = _get_idealness_table(end_points)
+        best_idealness = -1
+        most_ideal = None
+        for tile in pocket_tiles:
+            idealness = idealness_table[tile]
+            if idealness == sys.maxsize:
+                return list(_COORDS[tile])
+            if idealness > best_idealness:
+                best_idealness = idealness
+                most_ideal = tile
+        return list(_COORDS[most_ideal])
 
-                if not self.game_map[x][y].visited_idealness and not self.game_map[x][y].blocked:
-                    self.game_map[x][y].visited_idealness = True
-                    current.put(neighbor)
+    def _idealness_search(self, start, end_points):
+        """
+        Finds the most ideal tile in our 'pocket' of pathable space. 
+        The edge if it is available, or the best self destruct location otherwise
 
-        return most_ideal
+        The pocket is only flood filled the first time one of its tiles is searched on a board,
+        and its most ideal tile is remembered for each set of endpoints.
+        """
+        self._reset_pockets()
+        start_index = start[0] * ARENA_SIZE + start[1]
+        label = self.pocket_labels[start_index]
+        if not label:
+            label = len(self._pocket_tiles)
+            self._pocket_tiles.append(self._label_pocket(start_index, label))
+        #Idealness tables are built once per set of endpoints, so the table identifies the target edge
+        key = (label, id(_get_idealness_table(end_points)))
+        most_ideal = self._pocket_ideals.get(key)
+        if most_ideal is None:
+            most_ideal = self._most_ideal_tile(self._pocket_tiles[label], end_points)
+            self._pocket_ideals[key] = most_ideal
+        return list(most_ideal)
 
     def _get_neighbors(self, location):
         """Get the locations adjacent to a location
@@ -164,31 +626,39 @@ class ShortestPathFinder:
         """
         #VALDIATION
         #Add our most ideal tiles to current
-        current = queue.Queue()
+        blocked = self.blocked
+        visited = self.visited_validate
+        pathlength = self.pathlength
+        current = deque()
         if ideal_tile in end_points:
-            for location in end_points:
-               current.put(location)
-               #Set current pathlength to 0
-               self.game_map[location[0]][location[1]].pathlength = 0
-               self.game_map[location[0]][location[1]].visited_validate = True
+            for x, y in end_points:
+                index = x * ARENA_SIZE + y
+                current.append(index)
+                #Set current pathlength to 0
+                pathlength[index] = 0
+                visited[index] = 1
         else:
-            current.put(ideal_tile)
-            self.game_map[ideal_tile[0]][ideal_tile[1]].pathlength = 0
-            self.game_map[ideal_tile[0]][ideal_tile[1]].visited_validate = True
+            index = ideal_tile[0] * ARENA_SIZE + ideal_tile[1]
+            current.append(index)
+            pathlength[index] = 0
+            visited[index] = 1
 
         #While current is not empty
-        while not current.empty():
-            current_location = current.get()
-            current_node = self.game_map[current_location[0]][current_location[1]]
-            for neighbor in self._get_neighbors(current_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+        while current:
+            current_index = current.popleft()
+            # Blocked tiles can be seeded as endpoints, but paths never continue through them
+            if blocked[current_index]:
+                continue
+            next_pathlength = pathlength[current_index] + 1
+            for neighbor in _NEIGHBORS[current_index]:
+                if visited[neighbor] or blocked[neighbor]:
                     continue
+                pathlength[neighbor] = next_pathlength
+                visited[neighbor] = 1
+                current.append(neighbor)
 
-                neighbor_node = self.game_map[neighbor[0]][neighbor[1]]
-                if not neighbor_node.visited_validate and not current_node.blocked:
-                    neighbor_node.pathlength = current_node.pathlength + 1
-                    neighbor_node.visited_validate = True
-                    current.put(neighbor)
+        if self.stats is not None:
+            self.stats.validate_expansions += visited.count(1)
 
         #debug_write("Print after validate")
         #self.print_map()
@@ -200,56 +670,55 @@ class ShortestPathFinder:
         """
         #GET THE PATH
         path = [start_point]
-        current = start_point
+        current = start_point[0] * ARENA_SIZE + start_point[1]
         move_direction = 0
+        pathlength = self.pathlength
 
-        while not self.game_map[current[0]][current[1]].pathlength == 0:
-            #debug_write("current tile {} has cost {}".format(current, self.game_map[current[0]][current[1]].pathlength))
+        while not pathlength[current] == 0:
             next_move = self._choose_next_move(current, move_direction, end_points)
-            #debug_write(next_move)
 
-            if current[0] == next_move[0]:
+            if current // ARENA_SIZE == next_move // ARENA_SIZE:
                 move_direction = self.VERTICAL
             else:
                 move_direction = self.HORIZONTAL
-            path.append(next_move)
+            path.append(list(_COORDS[next_move]))
             current = next_move
-        
+
+        if self.stats is not None:
+            self.stats.paths += 1
+            self.stats.path_steps += len(path) - 1
         #debug_write(path)
         return path
-  
-    def _choose_next_move(self, current_point, previous_move_direction, end_points):
-        """Given the current location and adjacent locations, return the best 'next step' for a given unit to take
+
+    def _choose_next_move(self, current_index, previous_move_direction, end_points):
+        """Given the current tile index and adjacent tiles, return the index of the best 'next step' for a given unit to take
         """
-        neighbors = self._get_neighbors(current_point)
-        #debug_write("Unit at {} previously moved {} and has these neighbors {}".format(current_point, previous_move_direction, neighbors))
-
-        ideal_neighbor = current_point
-        best_pathlength = self.game_map[current_point[0]][current_point[1]].pathlength
-        for neighbor in neighbors:
-            #debug_write("Comparing champ {} and contender {}".format(ideal_neighbor, neighbor))
-            if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+        blocked = self.blocked
+        pathlength = self.pathlength
+        current_point = _COORDS[current_index]
+
+        ideal_neighbor = current_index
+        best_pathlength = pathlength[current_index]
+        for neighbor in _NEIGHBORS[current_index]:
+            if blocked[neighbor]:
                 continue
 
             new_best = False
-            x, y = neighbor
-            current_pathlength = self.game_map[x][y].pathlength
+            current_pathlength = pathlength[neighbor]
 
             #Filter by pathlength
             if current_pathlength > best_pathlength:
                 continue
             elif current_pathlength < best_pathlength:
-                #debug_write("Contender has better pathlength at {} vs champs {}".format(current_pathlength, best_pathlength))
                 new_best = True
 
             #Filter by direction based on prev move
-            if not new_best and not self._better_direction(current_point, neighbor, ideal_neighbor, previous_move_direction, end_points):
+            if not new_best and not self._better_direction(current_point, _COORDS[neighbor], _COORDS[ideal_neighbor], previous_move_direction, end_points):
                 continue
 
             ideal_neighbor = neighbor
             best_pathlength = current_pathlength
 
-        #debug_write("Gave unit at {} new tile {}".format(current_point, ideal_neighbor))
         return ideal_neighbor
 
     def _better_direction(self, prev_tile, new_tile, prev_best, previous_move_direction, end_points):
@@ -299,9 +768,9 @@ class ShortestPathFinder:
 
         for y in range(28):
             for x in range(28):
-                node = self.game_map[x][28 - y - 1]
-                if not node.blocked and not node.pathlength == -1:
-                    self._print_justified(node.pathlength)
+                index = x * ARENA_SIZE + (28 - y - 1)
+                if not self.blocked[index] and not self.pathlength[index] == -1:
+                    self._print_justified(self.pathlength[index])
                 else:
                     sys.stderr.write("   ")
             debug_write("")
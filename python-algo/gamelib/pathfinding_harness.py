@@ -0,0 +1,453 @@
+"""
+A differential test and benchmark harness for the pathfinder.
+
+Random structure layouts are generated, and the path from every edge start to its target edge
+is found by both the original pathfinder (kept here as ReferencePathFinder) and ShortestPathFinder.
+The paths on the mirrored view of each layout, see GameState.mirrored, are checked against the same reference paths.
+Any difference in the paths is raised as an AssertionError, and the throughput of each
+implementation is reported in paths per second.
+
+Run it from the python-algo folder with::
+
+    python -m gamelib.pathfinding_harness --layouts 50 --seed 0
+
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import time
+
+from .game_state import GameState, _EMPTY_TURN
+from .navigation import ShortestPathFinder
+from .util import debug_write
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game-configs.json")
+DEFAULT_DENSITIES = (0.05, 0.2, 0.35, 0.5, 0.65)
+
+
+class _ReferenceNode:
+    """A pathfinding node of the reference pathfinder
+
+    Attributes :
+        * visited_idealness (bool): Have we visited this node during the idealness search step?
+        * visited_validate (bool): Have we visited this node during the validation step?
+        * blocked (bool): Is there a structures at this node's location
+        * pathlength: The distance between this node and the target location
+
+    """
+    def __init__(self):
+        self.visited_idealness = False
+        self.visited_validate = False
+        self.blocked = False
+        self.pathlength = -1
+
+
+class ReferencePathFinder:
+    """The original, unoptimized pathfinder, kept as the ground truth for ShortestPathFinder
+
+    It has the same navigate_multiple_endpoints interface. It should not be changed, since
+    its tie-breaking rules define the paths the game engine produces.
+
+    Attributes :
+        * HORIZONTAL (int): A constant representing a horizontal movement
+        * VERTICAL (int): A constant representing a vertical movement
+
+        * game_state (:obj: GameState): The current gamestate
+        * game_map (:obj: list): A 2d list of _ReferenceNode indexed by [x][y]
+
+    """
+    def __init__(self):
+        self.HORIZONTAL = 1
+        self.VERTICAL = 2
+        self.initialized = False
+
+    def initialize_map(self, game_state):
+        """Initializes the map
+
+        Args:
+            game_state: A GameState object representing the gamestate we want to traverse
+        """
+        self.initialized = True
+        self.game_state = game_state
+        self.game_map = [[_ReferenceNode() for x in range(self.game_state.ARENA_SIZE)] for y in range(self.game_state.ARENA_SIZE)]
+
+    def navigate_multiple_endpoints(self, start_point, end_points, game_state):
+        """Finds the path a unit would take to reach a set of endpoints
+
+        Args:
+            * start_point: The starting location of the unit
+            * end_points: The end points of the unit, should be a list of edge locations
+            * game_state: The current game state
+
+        Returns:
+            The path a unit at start_point would take when trying to reach end_points given the current game state.
+
+        """
+        if game_state.contains_stationary_unit(start_point):
+            return
+
+        self.initialize_map(game_state)
+        for location in self.game_state.game_map:
+            if self.game_state.contains_stationary_unit(location):
+                self.game_map[location[0]][location[1]].blocked = True
+        ideal_endpoints = self._idealness_search(start_point, end_points)
+        self._validate(ideal_endpoints, end_points)
+        return self._get_path(start_point, end_points)
+
+    def _idealness_search(self, start, end_points):
+        """
+        Finds the most ideal tile in our 'pocket' of pathable space.
+        The edge if it is available, or the best self destruct location otherwise
+        """
+        current = queue.Queue()
+        current.put(start)
+        best_idealness = self._get_idealness(start, end_points)
+        self.game_map[start[0]][start[1]].visited_idealness = True
+        most_ideal = start
+
+        while not current.empty():
+            search_location = current.get()
+            for neighbor in self._get_neighbors(search_location):
+                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+                    continue
+
+                x, y = neighbor
+                current_idealness = self._get_idealness(neighbor, end_points)
+
+                if current_idealness > best_idealness:
+                    best_idealness = current_idealness
+                    most_ideal = neighbor
+
+                if not self.game_map[x][y].visited_idealness and not self.game_map[x][y].blocked:
+                    self.game_map[x][y].visited_idealness = True
+                    current.put(neighbor)
+
+        return most_ideal
+
+    def _get_neighbors(self, location):
+        """Get the locations adjacent to a location
+        """
+        x, y = location
+        return [[x, y + 1], [x, y - 1], [x + 1, y], [x - 1, y]]
+
+    def _get_direction_from_endpoints(self, end_points):
+        """Gets the direction of an edge
+
+        Args:
+            * end_points: A set of endpoints, should be an edge
+
+        Returns:
+            A direction [x,y] representing the edge. For example, [1,1] for the top right and [-1, 1] for the top left
+
+        """
+        point = end_points[0]
+        x, y = point
+        direction = [1, 1]
+        if x < self.game_state.HALF_ARENA:
+           direction[0] = -1
+        if y < self.game_state.HALF_ARENA:
+            direction[1] = -1
+        return direction
+
+    def _get_idealness(self, location, end_points):
+        """Get the idealness of a tile, the reachable tile the unit most wants to path to.
+        Better self destruct locations are more ideal. The endpoints are perfectly ideal.
+        """
+        if location in end_points:
+            return sys.maxsize
+
+        direction = self._get_direction_from_endpoints(end_points)
+
+        idealness = 0
+        if direction[1] == 1:
+            idealness += 28 * location[1]
+        else:
+            idealness += 28 * (27 - location[1])
+        if direction[0] == 1:
+            idealness += location[0]
+        else:
+            idealness += (27 - location[0])
+
+        return idealness
+
+    def _validate(self, ideal_tile, end_points):
+        """Breadth first search of the grid, setting the pathlengths of each node
+
+        """
+        current = queue.Queue()
+        if ideal_tile in end_points:
+            for location in end_points:
+               current.put(location)
+               self.game_map[location[0]][location[1]].pathlength = 0
+               self.game_map[location[0]][location[1]].visited_validate = True
+        else:
+            current.put(ideal_tile)
+            self.game_map[ideal_tile[0]][ideal_tile[1]].pathlength = 0
+            self.game_map[ideal_tile[0]][ideal_tile[1]].visited_validate = True
+
+        while not current.empty():
+            current_location = current.get()
+            current_node = self.game_map[current_location[0]][current_location[1]]
+            for neighbor in self._get_neighbors(current_location):
+                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+                    continue
+
+                neighbor_node = self.game_map[neighbor[0]][neighbor[1]]
+                if not neighbor_node.visited_validate and not current_node.blocked:
+                    neighbor_node.pathlength = current_node.pathlength + 1
+                    neighbor_node.visited_validate = True
+                    current.put(neighbor)
+
+    def _get_path(self, start_point, end_points):
+        """Once all nodes are validated, and a target is found, the unit can path to its target
+
+        """
+        path = [start_point]
+        current = start_point
+        move_direction = 0
+
+        while not self.game_map[current[0]][current[1]].pathlength == 0:
+            next_move = self._choose_next_move(current, move_direction, end_points)
+
+            if current[0] == next_move[0]:
+                move_direction = self.VERTICAL
+            else:
+                move_direction = self.HORIZONTAL
+            path.append(next_move)
+            current = next_move
+
+        return path
+
+    def _choose_next_move(self, current_point, previous_move_direction, end_points):
+        """Given the current location and adjacent locations, return the best 'next step' for a given unit to take
+        """
+        neighbors = self._get_neighbors(current_point)
+
+        ideal_neighbor = current_point
+        best_pathlength = self.game_map[current_point[0]][current_point[1]].pathlength
+        for neighbor in neighbors:
+            if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+                continue
+
+            new_best = False
+            x, y = neighbor
+            current_pathlength = self.game_map[x][y].pathlength
+
+            #Filter by pathlength
+            if current_pathlength > best_pathlength:
+                continue
+            elif current_pathlength < best_pathlength:
+                new_best = True
+
+            #Filter by direction based on prev move
+            if not new_best and not self._better_direction(current_point, neighbor, ideal_neighbor, previous_move_direction, end_points):
+                continue
+
+            ideal_neighbor = neighbor
+            best_pathlength = current_pathlength
+
+        return ideal_neighbor
+
+    def _better_direction(self, prev_tile, new_tile, prev_best, previous_move_direction, end_points):
+        """Compare two tiles and return True if the unit would rather move to the new one
+
+        """
+        if previous_move_direction == self.HORIZONTAL and not new_tile[0] == prev_best[0]:
+            if prev_tile[1] == new_tile[1]:
+                return False
+            return True
+        if previous_move_direction == self.VERTICAL and not new_tile[1] == prev_best[1]:
+            if prev_tile[0] == new_tile[0]:
+                return False
+            return True
+        if previous_move_direction == 0:
+            if prev_tile[1] == new_tile[1]:
+                return False
+            return True
+
+        #To make it here, both moves are on the same axis
+        direction = self._get_direction_from_endpoints(end_points)
+        if new_tile[1] == prev_best[1]:
+            if direction[0] == 1 and new_tile[0] > prev_best[0]:
+                return True
+            if direction[0] == -1 and new_tile[0] < prev_best[0]:
+                return True
+            return False
+        if new_tile[0] == prev_best[0]:
+            if direction[1] == 1 and new_tile[1] > prev_best[1]:
+                return True
+            if direction[1] == -1 and new_tile[1] < prev_best[1]:
+                return True
+            return False
+        return True
+
+
+def random_layout(config, rng, density):
+    """Creates a game state with structures placed at random
+
+    Each arena tile holds a random structure type with the given probability. Structures on
+    the bottom half belong to player 0 and structures on the top half belong to player 1.
+
+    Args:
+        * config: A json object containing information about the game
+        * rng: The random.Random instance to draw from
+        * density: The chance of each tile holding a structure, between 0 and 1
+
+    Returns:
+        A GameState holding the layout
+    """
+    game_state = GameState(config, _EMPTY_TURN)
+    game_state.suppress_warnings(True)
+    structure_types = [config["unitInformation"][index]["shorthand"] for index in range(3)]
+    game_map = game_state.game_map
+    for location in list(game_map):
+        if rng.random() < density:
+            player_index = 0 if location[1] < game_state.HALF_ARENA else 1
+            game_map.add_unit(rng.choice(structure_types), location, player_index)
+    return game_state
+
+
+def compare_pathfinders(game_state):
+    """Paths from every unblocked edge start to its target edge with both pathfinders
+
+    ShortestPathFinder is checked both one start at a time and batched per edge with navigate_from_multiple_starts.
+    The mirrored view of the game state is checked too: its paths must be the reference paths, mirrored.
+
+    Args:
+        * game_state: The game state to path on
+
+    Returns:
+        A tuple of the number of paths found, and the seconds spent by the reference,
+        single start and batched pathfinders
+
+    Raises:
+        AssertionError: If any path differs from the reference path
+    """
+    game_map = game_state.game_map
+    reference_paths = {}
+    edges = game_map.get_edges()
+    reference = ReferencePathFinder()
+    optimized = ShortestPathFinder()
+    batched = ShortestPathFinder()
+    path_count = 0
+    reference_time = optimized_time = batched_time = 0.0
+
+    for edge in edges:
+        start_points = [location for location in edge if not game_state.contains_stationary_unit(location)]
+        if not start_points:
+            continue
+        end_points = edges[game_state.get_target_edge(start_points[0])]
+        start_time = time.perf_counter()
+        batched_paths = batched.navigate_from_multiple_starts(start_points, end_points, game_state)
+        batched_time += time.perf_counter() - start_time
+
+        for start_point, batched_path in zip(start_points, batched_paths):
+            start_time = time.perf_counter()
+            expected = reference.navigate_multiple_endpoints(start_point, end_points, game_state)
+            reference_time += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            path = optimized.navigate_multiple_endpoints(start_point, end_points, game_state)
+            optimized_time += time.perf_counter() - start_time
+            path_count += 1
+
+            reference_paths[tuple(start_point)] = expected
+
+            if path != expected:
+                raise AssertionError("Path from {} differs from the reference.\nReference: {}\nOptimized: {}".format(start_point, expected, path))
+            if batched_path != expected:
+                raise AssertionError("Batched path from {} differs from the reference.\nReference: {}\nBatched: {}".format(start_point, expected, batched_path))
+
+    compare_mirrored_paths(game_state, reference_paths)
+    return path_count, reference_time, optimized_time, batched_time
+
+
+def compare_mirrored_paths(game_state, reference_paths):
+    """Checks that pathing on the mirrored view of a game state gives the real paths, mirrored
+
+    Every spawn path of the view is found both batched with find_paths_from_all_spawns and one start at a time
+    with a new ShortestPathFinder, so that no path is read back from a cache.
+
+    Args:
+        * game_state: The game state to mirror
+        * reference_paths: A dict mapping each unblocked edge start of game_state, as an (x, y) tuple, to its reference path
+
+    Raises:
+        AssertionError: If any path on the view differs from the mirrored reference path
+    """
+    view = game_state.mirrored()
+    last_row = game_state.ARENA_SIZE - 1
+    edges = view.game_map.get_edges()
+    for player_index in (0, 1):
+        for start_point, batched_path in view.find_paths_from_all_spawns(player_index).items():
+            x, y = start_point
+            expected = [[path_x, last_row - path_y] for path_x, path_y in reference_paths[(x, last_row - y)]]
+            path = ShortestPathFinder().navigate_multiple_endpoints([x, y], edges[view.get_target_edge(start_point)], view)
+            if path != expected:
+                raise AssertionError("Mirrored path from {} differs from the reference.\nReference: {}\nMirrored: {}".format(start_point, expected, path))
+            if batched_path != expected:
+                raise AssertionError("Mirrored batched path from {} differs from the reference.\nReference: {}\nMirrored: {}".format(start_point, expected, batched_path))
+
+
+def run_harness(config, layouts=50, seed=0, densities=DEFAULT_DENSITIES):
+    """Compares the pathfinders on a number of random layouts
+
+    Args:
+        * config: A json object containing information about the game
+        * layouts: The number of random layouts to check
+        * seed: The seed of the random layouts, the same seed always produces the same layouts
+        * densities: The structure densities to choose from for each layout
+
+    Returns:
+        A dict with the number of layouts and paths checked, and the paths per second of each pathfinder
+
+    Raises:
+        AssertionError: If any path differs from the reference path
+    """
+    rng = random.Random(seed)
+    path_count = 0
+    reference_time = optimized_time = batched_time = 0.0
+    for layout in range(layouts):
+        game_state = random_layout(config, rng, rng.choice(densities))
+        try:
+            layout_result = compare_pathfinders(game_state)
+        except AssertionError as error:
+            raise AssertionError("Layout {} with seed {}: {}".format(layout, seed, error))
+        path_count += layout_result[0]
+        reference_time += layout_result[1]
+        optimized_time += layout_result[2]
+        batched_time += layout_result[3]
+
+    def rate(seconds):
+        return path_count / seconds if seconds > 0 else 0.0
+
+    return {
+        "layouts": layouts,
+        "paths": path_count,
+        "reference_paths_per_second": rate(reference_time),
+        "optimized_paths_per_second": rate(optimized_time),
+        "batched_paths_per_second": rate(batched_time),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check ShortestPathFinder against the reference pathfinder and measure its throughput.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Path to the game config json")
+    parser.add_argument("--layouts", type=int, default=50, help="Number of random layouts to check")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random layouts")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as config_file:
+        config = json.load(config_file)
+    result = run_harness(config, args.layouts, args.seed)
+    debug_write("Checked {} paths on {} layouts, all identical to the reference".format(result["paths"], result["layouts"]))
+    debug_write("Reference: {:.0f} paths/s".format(result["reference_paths_per_second"]))
+    debug_write("Optimized: {:.0f} paths/s".format(result["optimized_paths_per_second"]))
+    debug_write("Batched: {:.0f} paths/s".format(result["batched_paths_per_second"]))
+    return result
+
+
+if __name__ == "__main__":
+    main()
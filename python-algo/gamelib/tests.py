@@ -1,5 +1,9 @@
 import unittest
 import json
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from .game_state import GameState
 from .unit import GameUnit
 
@@ -275,3 +279,591 @@ class BasicTests(unittest.TestCase):
         actual = game.project_future_MP(turns)
         self.assertAlmostEqual(actual, expected, 0, "Expected {} MP {} turns from now, got {}".format(expected, turns, actual))
 
+
+    def test_pathing(self):
+        game = self.make_turn_0_map()
+
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual(29, len(path), "Unblocked path from [13, 0] should cross the whole map")
+        self.assertIn(path[-1], game.game_map.get_edge_locations(game.game_map.TOP_RIGHT), "Path should end on the top right edge")
+        self.assertEqual([[13, 0], [13, 1], [14, 1], [14, 2]], path[:4], "Path should zig-zag towards the target edge")
+
+        for x in range(3, 25):
+            game.game_map.add_unit("FF", [x, 10])
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual([23, 9], path[-1], "A walled in unit should self destruct at the most ideal reachable tile")
+        self.assertEqual(20, len(path), "Wrong self destruct path length")
+        self.assertIsNone(game.find_path_to_edge([13, 10]), "Pathing from a blocked location should fail")
+
+    def test_path_cache(self):
+        game = self.make_turn_0_map()
+
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual(path, game.find_path_to_edge([13, 0]), "Cached path should match the computed path")
+        self.assertEqual(1, game._path_cache.hits, "Second identical query should hit the cache")
+
+        game.game_map.add_unit("FF", path[5])
+        self.assertNotIn(path[5], game.find_path_to_edge([13, 0]), "Placing a structure should invalidate the cached path")
+        game.game_map.remove_unit(path[5])
+        self.assertEqual(path, game.find_path_to_edge([13, 0]), "Removing the structure should restore the original path")
+        self.assertEqual(2, game._path_cache.hits, "The original layout should still be cached")
+
+    def test_paths_from_all_spawns(self):
+        game = self.make_turn_0_map()
+        for x in range(5, 20):
+            game.game_map.add_unit("FF", [x, 12])
+        game.game_map.add_unit("FF", [13, 0])
+
+        paths = game.find_paths_from_all_spawns(0)
+        self.assertEqual(27, len(paths), "Every unblocked friendly edge location should have a path")
+        self.assertNotIn((13, 0), paths, "Blocked edge locations cannot be deployed to")
+        self.assertEqual(28, len(game.find_paths_from_all_spawns(1)), "Every enemy edge location should have a path")
+
+        # Compare with pathfinders that have no path cache, on a few layouts with real detours
+        import random
+        from .navigation import ShortestPathFinder
+        from .pathfinding_harness import ReferencePathFinder, random_layout
+        rng = random.Random(3)
+        layouts = [game] + [random_layout(game.config, rng, density) for density in (0.2, 0.35, 0.5)]
+        for layout in layouts:
+            edges = layout.game_map.get_edges()
+            for player_index in [0, 1]:
+                for location, path in layout.find_paths_from_all_spawns(player_index).items():
+                    end_points = edges[layout.get_target_edge(location)]
+                    expected = ReferencePathFinder().navigate_multiple_endpoints(list(location), end_points, layout)
+                    self.assertEqual(expected, path, "Batched path from {} differs from the reference".format(location))
+                    self.assertEqual(expected, ShortestPathFinder().navigate_multiple_endpoints(list(location), end_points, layout))
+
+    def test_dynamic_pathing(self):
+        game = self.make_turn_0_map()
+        reference = self.make_turn_0_map()
+        game.use_dynamic_pathing(True)
+
+        edits = [[13, 1], [14, 2], [10, 10], [17, 10], [13, 1], [12, 12], [14, 2], [13, 5]]
+        for x in range(3, 25):
+            edits.append([x, 10])
+        for location in edits:
+            for state in [game, reference]:
+                if state.contains_stationary_unit(location):
+                    state.game_map.remove_unit(location)
+                else:
+                    state.game_map.add_unit("FF", location)
+            self.assertEqual(reference.find_path_to_edge([13, 0]), game.find_path_to_edge([13, 0]), "Dynamic path differs after editing {}".format(location))
+            self.assertEqual(reference.find_path_to_edge([0, 13]), game.find_path_to_edge([0, 13]), "Dynamic path differs after editing {}".format(location))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_pathlength_field(self):
+        game = self.make_turn_0_map()
+        for x in range(3, 25):
+            game.game_map.add_unit("FF", [x, 10])
+        game.game_map.remove_unit([20, 10])
+
+        field = game.get_pathlength_field(game.game_map.TOP_RIGHT)
+        self.assertEqual((28, 28), field.shape, "Pathlength field should cover the whole board")
+        self.assertEqual(0, field[27, 14], "Edge tiles should have a pathlength of 0")
+        self.assertEqual(-1, field[13, 10], "Blocked tiles should be unreachable")
+        self.assertEqual(-1, field[0, 0], "Tiles outside the arena should be unreachable")
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual(len(path) - 1, field[13, 0], "Field should match the length of the path")
+
+    def test_evaluate_placements(self):
+        from .pathfinding_harness import ReferencePathFinder
+        walls = [[x, 10] for x in range(3, 25) if x != 20]
+        game = self.make_turn_0_map()
+        for location in walls:
+            game.game_map.add_unit("FF", location)
+        blocked = game.game_map.get_blocked_locations()
+        board_hash = game.game_map.get_board_hash(True)
+
+        candidates = [[20, 10], [13, 0], [5, 10], [13, 20]]
+        results = game.evaluate_placements(candidates)
+        self.assertEqual(blocked, game.game_map.get_blocked_locations(), "Evaluating placements should not change the map")
+        self.assertEqual(board_hash, game.game_map.get_board_hash(True), "Evaluating placements should not change the map")
+        self.assertFalse(game._shortest_path_finder.dynamic, "Dynamic pathing should be restored")
+        self.assertIsNone(results[2], "Occupied locations cannot be evaluated")
+        cached_paths = len(game._path_cache)
+        hits = game._path_cache.hits
+        real_paths = len(game.find_paths_from_all_spawns(0)) + len(game.find_paths_from_all_spawns(1))
+        self.assertEqual(real_paths, cached_paths, "Only paths on the real board should be cached")
+        self.assertEqual(hits + real_paths, game._path_cache.hits, "Paths on the real board should still be cached")
+
+        before, after = results[0][0][(13, 0)]
+        self.assertFalse(before[2], "The gap should let units reach the edge")
+        self.assertTrue(after[2], "Closing the gap should force a self destruct")
+        self.assertEqual((before, None), results[1][0][(13, 0)], "Blocking a spawn location should remove its path")
+
+        def reference_summaries(structures):
+            # Paths on a separate game state with the structures really placed, found without any path cache
+            state = self.make_turn_0_map()
+            for location in structures:
+                state.game_map.add_unit("FF", location)
+            edges = state.game_map.get_edges()
+            summaries = [{}, {}]
+            for player_index, spawn_edges in [(0, [state.game_map.BOTTOM_LEFT, state.game_map.BOTTOM_RIGHT]), (1, [state.game_map.TOP_LEFT, state.game_map.TOP_RIGHT])]:
+                for spawn_edge in spawn_edges:
+                    for spawn in edges[spawn_edge]:
+                        if state.contains_stationary_unit(spawn):
+                            continue
+                        end_points = edges[state.get_target_edge(spawn)]
+                        path = ReferencePathFinder().navigate_multiple_endpoints(spawn, end_points, state)
+                        summaries[player_index][tuple(spawn)] = [len(path) - 1, path[-1], path[-1] not in end_points]
+            return summaries
+
+        baseline = reference_summaries(walls)
+        for location, changes in zip(candidates, results):
+            if changes is None:
+                continue
+            placed = reference_summaries(walls + [location])
+            for player_index in [0, 1]:
+                expected = {spawn: (before, placed[player_index].get(spawn))
+                            for spawn, before in baseline[player_index].items() if placed[player_index].get(spawn) != before}
+                self.assertEqual(expected, changes[player_index], "Evaluated paths for {} are wrong".format(location))
+
+        with self.assertRaises(TypeError):
+            game.evaluate_placements([None])
+        self.assertFalse(game._shortest_path_finder.dynamic, "Dynamic pathing should be restored after an error")
+
+    def test_pathing_stats(self):
+        game = self.make_turn_0_map()
+        stats = game.enable_pathing_stats()
+
+        game.find_path_to_edge([13, 0])
+        game.find_path_to_edge([13, 0])
+        game.find_paths_from_all_spawns(0)
+        summary = stats.as_dict()
+        self.assertEqual(3, summary["calls"], "Expected one single query and one batch per spawn edge")
+        self.assertEqual(28, summary["paths"], "Cached paths should not reach the pathfinder")
+        self.assertEqual(2, summary["cache_hits"], "Repeated queries should hit the cache")
+        self.assertTrue(summary["validate_expansions"] > 0, "Validation should expand tiles")
+        self.assertTrue(summary["total_ms"] > 0, "Calls should be timed")
+
+    def test_idealness_tables(self):
+        from .navigation import ShortestPathFinder, _get_idealness_table
+        game = self.make_turn_0_map()
+        finder = ShortestPathFinder()
+        finder.initialize_map(game)
+        for end_points in game.game_map.get_edges():
+            table = _get_idealness_table(end_points)
+            for location in game.game_map:
+                self.assertEqual(finder._get_idealness(location, end_points), table[location[0] * 28 + location[1]], "Idealness table differs at {}".format(location))
+
+    def test_pocket_labels(self):
+        from .navigation import ShortestPathFinder
+        game = self.make_turn_0_map()
+        for x in range(3, 25):
+            game.game_map.add_unit("FF", [x, 10])
+        finder = ShortestPathFinder()
+        end_points = game.game_map.get_edge_locations(game.game_map.TOP_RIGHT)
+        first = finder.navigate_multiple_endpoints([13, 0], end_points, game)
+        label = finder.pocket_labels[13 * 28 + 0]
+        second = finder.navigate_multiple_endpoints([10, 3], end_points, game)
+        self.assertEqual(label, finder.pocket_labels[10 * 28 + 3], "Starts in the same pocket should share a label")
+        self.assertEqual(first[-1], second[-1], "Starts in the same pocket should self destruct at the same tile")
+        self.assertEqual(1, len(finder._pocket_ideals), "The pocket's most ideal tile should only be found once")
+
+        game.game_map.remove_unit([13, 10])
+        path = finder.navigate_multiple_endpoints([13, 0], end_points, game)
+        self.assertIn(path[-1], end_points, "Labels should be recomputed once the board changes")
+
+    def test_pathfinding_harness(self):
+        from .pathfinding_harness import run_harness
+        result = run_harness(self.make_turn_0_map().config, layouts=2, seed=0)
+        self.assertEqual(2, result["layouts"])
+        self.assertGreater(result["paths"], 0, "The harness should path from the edge starts")
+        self.assertGreater(result["optimized_paths_per_second"], 0)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_map_layers(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        layers = game.game_map.get_layers()
+        self.assertEqual(0, layers["structure_type"][13, 10], "Structure type should be the unitInformation index")
+        self.assertEqual(0, layers["owner"][13, 10])
+
+        game.game_map.add_unit("DF", [14, 17], 1)
+        game.game_map.add_unit("PI", [13, 0])
+        game.game_map.add_unit("PI", [13, 0])
+        game.game_map[14, 17][0].upgrade()
+        game.game_map._update_tile(14, 17)
+        self.assertEqual(2, layers["structure_type"][14, 17])
+        self.assertEqual(1, layers["owner"][14, 17])
+        self.assertTrue(layers["upgraded"][14, 17], "Upgrades should be reflected after _update_tile")
+        self.assertEqual(2, layers["mobile_counts"][0, 13, 0], "Mobile units should be counted per player")
+        self.assertEqual(game.game_map[13, 10][0].health + game.game_map[14, 17][0].health, layers["health"].sum())
+
+        game.game_map.remove_unit([13, 10])
+        self.assertEqual(-1, layers["structure_type"][13, 10], "Removed structures should be cleared")
+        self.assertEqual(1, (layers["owner"] >= 0).sum())
+
+    def test_arena_tables(self):
+        from .game_map import ARENA_MASK, ARENA_LOCATIONS, BOTTOM_HALF_LOCATIONS, TOP_HALF_LOCATIONS
+        game = self.make_turn_0_map()
+        self.assertEqual(420, len(ARENA_LOCATIONS))
+        self.assertEqual(210, len(BOTTOM_HALF_LOCATIONS))
+        self.assertEqual(set(ARENA_LOCATIONS), set(BOTTOM_HALF_LOCATIONS + TOP_HALF_LOCATIONS))
+        self.assertEqual([list(location) for location in ARENA_LOCATIONS], list(game.game_map), "Iteration should follow the location table")
+        self.assertEqual(sum(map(sum, ARENA_MASK)), 420)
+        self.assertFalse(game.game_map.in_arena_bounds([-1, 13]))
+        self.assertFalse(game.game_map.in_arena_bounds([13, 28]))
+        self.assertTrue(game.game_map.in_arena_bounds([13.0, 0]), "Float coordinates should still be accepted")
+
+    def test_iter_structures(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        game.game_map.add_unit("DF", [14, 17], 1)
+        game.game_map.add_unit("FF", [10, 16], 1)
+        game.game_map.add_unit("PI", [13, 0])
+
+        pairs = [(a, b) for a in game.game_map for b in game.game_map]
+        self.assertEqual(420 * 420, len(pairs), "Nested loops over the map should not interfere")
+
+        self.assertEqual([[13, 10], [10, 16], [14, 17]], [[unit.x, unit.y] for unit in game.game_map.iter_structures()])
+        self.assertEqual([[10, 16], [14, 17]], [[unit.x, unit.y] for unit in game.game_map.iter_structures(player_index=1)])
+        self.assertEqual([[13, 10], [10, 16]], [[unit.x, unit.y] for unit in game.game_map.iter_structures(unit_type="FF")])
+        self.assertEqual([[14, 17]], [[unit.x, unit.y] for unit in game.game_map.iter_structures(region=[[14, 17], [13, 0]])])
+
+        game.game_map.remove_unit([10, 16])
+        game.game_map.add_unit("EF", [13, 10], 0)
+        self.assertEqual(["EF", "DF"], [unit.unit_type for unit in game.game_map.iter_structures()], "The index should follow changes to the map")
+        self.assertEqual(frozenset([(13, 10), (14, 17)]), game.game_map.get_blocked_locations())
+
+    def test_range_stencils(self):
+        game_map = self.make_turn_0_map().game_map
+        for radius in (0.5, 1.5, 3.5, 4.5):
+            for location in ([13, 0], [0, 13], [14, 14], [27, 14]):
+                expected = [[x, y] for x in range(28) for y in range(28)
+                    if game_map.in_arena_bounds([x, y]) and game_map.distance_between_locations(location, [x, y]) < radius + 0.01]
+                self.assertEqual(expected, game_map.get_locations_in_range(location, radius), "Wrong locations in range {} of {}".format(radius, location))
+
+    def test_fork(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        game.game_map.add_unit("PI", [13, 0])
+        parent_wall = game.game_map[13, 10][0]
+        child = game.fork()
+
+        child.game_map.add_unit("FF", [14, 10])
+        child.game_map.add_unit("PI", [13, 0])
+        child.game_map.remove_unit([13, 10])
+        self.assertEqual(parent_wall, game.contains_stationary_unit([13, 10]), "Removing from the child should not affect the parent")
+        self.assertFalse(game.contains_stationary_unit([14, 10]), "Adding to the child should not affect the parent")
+        self.assertEqual(1, len(game.game_map[13, 0]), "Mobile units added to the child should not appear in the parent")
+        self.assertEqual(2, len(child.game_map[13, 0]))
+
+        upgrade_child = game.fork()
+        self.assertEqual(1, upgrade_child.attempt_upgrade([13, 10]))
+        self.assertFalse(parent_wall.upgraded, "Upgrading in the child should not upgrade the parent's unit")
+        self.assertTrue(upgrade_child.game_map[13, 10][0].upgraded)
+        self.assertEqual([], game._build_stack, "Build stacks should be copied")
+        self.assertNotEqual(game.get_resource(game.SP), upgrade_child.get_resource(game.SP), "Resources should be copied")
+        self.assertEqual(frozenset([(13, 10)]), game.game_map.get_blocked_locations())
+        self.assertEqual(frozenset([(14, 10)]), child.game_map.get_blocked_locations())
+
+        stats = game.enable_pathing_stats()
+        pathing_child = game.fork()
+        self.assertIs(game._path_cache, pathing_child._path_cache, "Path caches should be shared")
+        pathing_child.use_dynamic_pathing(True)
+        child_stats = pathing_child.enable_pathing_stats()
+        self.assertFalse(game._shortest_path_finder.dynamic, "Dynamic pathing on a fork should not affect the parent")
+        self.assertIs(stats, game._shortest_path_finder.stats, "Pathing stats on a fork should not affect the parent")
+        pathing_child.find_path_to_edge([13, 0])
+        self.assertEqual([0, 1], [stats.calls, child_stats.calls])
+
+    def test_savepoint_rollback(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        wall = game.game_map[13, 10][0]
+        resources = game.get_resources()
+        blocked = game.game_map.get_blocked_locations()
+        path = game.find_path_to_edge([13, 0])
+
+        savepoint = game.savepoint()
+        self.assertEqual(2, game.attempt_spawn("FF", [[12, 10], [14, 10]]))
+        self.assertEqual(1, game.attempt_upgrade([13, 10]))
+        game.attempt_remove([12, 10])
+        inner = game.savepoint()
+        game.game_map.add_unit("PI", [13, 0])
+        game.rollback(inner)
+        self.assertEqual([], game.game_map[13, 0], "Rolling back to the inner savepoint should undo the mobile unit")
+        self.assertTrue(game.game_map[13, 10][0].upgraded, "Changes before the inner savepoint should be kept")
+
+        game.rollback(savepoint)
+        self.assertEqual(blocked, game.game_map.get_blocked_locations(), "Spawned structures should be removed")
+        self.assertIs(wall, game.game_map[13, 10][0])
+        self.assertFalse(wall.upgraded, "Upgrades should be undone")
+        self.assertEqual(resources, game.get_resources(), "Resources should be restored")
+        self.assertEqual([], game._build_stack, "The build stack should be restored")
+        self.assertEqual(path, game.find_path_to_edge([13, 0]))
+
+        self.assertTrue(game.rollback(savepoint))
+        self.assertEqual(1, game.attempt_spawn("FF", [6, 10]))
+        game.attempt_spawn("PI", [13, 0])
+        game.commit()
+        game.game_map.add_unit("FF", [5, 10])
+        resources = game.get_resources()
+        build_stack = list(game._build_stack)
+        deploy_stack = list(game._deploy_stack)
+        self.assertFalse(game.rollback(savepoint), "Rolling back after commit should be refused")
+        self.assertTrue(game.contains_stationary_unit([5, 10]), "Changes after commit should not be undone")
+        self.assertTrue(game.contains_stationary_unit([6, 10]))
+        self.assertEqual(resources, game.get_resources(), "A refused rollback should not restore resources")
+        self.assertEqual(build_stack, game._build_stack, "A refused rollback should not change the build stack")
+        self.assertEqual(deploy_stack, game._deploy_stack, "A refused rollback should not change the deploy stack")
+        self.assertEqual(1, len(deploy_stack))
+
+        def snapshot(state):
+            return (state.game_map.get_board_hash(), state.get_resources(), list(state._build_stack), list(state._deploy_stack))
+
+        # A savepoint from before a commit is refused, even once a new savepoint is open
+        game = self.make_turn_0_map()
+        committed = game.savepoint()
+        game.attempt_spawn("FF", [13, 10])
+        game.commit()
+        game.savepoint()
+        game.attempt_spawn("FF", [14, 10])
+        state = snapshot(game)
+        self.assertFalse(game.rollback(committed), "A committed savepoint should be refused")
+        self.assertEqual(state, snapshot(game), "A refused rollback should change nothing")
+
+        # A savepoint that was rolled back past is refused, even once the undo log has grown past it again
+        game = self.make_turn_0_map()
+        outer = game.savepoint()
+        game.attempt_spawn("FF", [13, 10])
+        inner = game.savepoint()
+        game.attempt_spawn("FF", [14, 10])
+        self.assertTrue(game.rollback(outer))
+        game.attempt_spawn("DF", [10, 10])
+        game.attempt_spawn("DF", [11, 10])
+        state = snapshot(game)
+        self.assertFalse(game.rollback(inner), "A savepoint that was rolled back past should be refused")
+        self.assertEqual(state, snapshot(game), "A refused rollback should change nothing")
+        self.assertTrue(game.rollback(outer), "Rolling back should keep the savepoint valid")
+        self.assertEqual([], game._build_stack)
+
+    def test_board_hash(self):
+        game = self.make_turn_0_map()
+        empty_hash = game.game_map.get_board_hash()
+        game.game_map.add_unit("FF", [13, 10])
+        game.game_map.add_unit("DF", [14, 17], 1)
+        layout_hash = game.game_map.get_board_hash()
+        self.assertNotEqual(empty_hash, layout_hash)
+
+        other = self.make_turn_0_map()
+        other.game_map.add_unit("DF", [14, 17], 1)
+        other.game_map.add_unit("PI", [13, 0])
+        other.game_map.add_unit("FF", [13, 10])
+        self.assertEqual(layout_hash, other.game_map.get_board_hash(), "The same layout should have the same hash in any order, ignoring mobile units")
+        other.game_map.remove_unit([14, 17])
+        other.game_map.add_unit("DF", [14, 17], 0)
+        self.assertNotEqual(layout_hash, other.game_map.get_board_hash(), "The owner should be part of the hash")
+
+        savepoint = game.savepoint()
+        game.attempt_upgrade([13, 10])
+        self.assertNotEqual(layout_hash, game.game_map.get_board_hash(), "Upgrades should change the hash")
+        game.rollback(savepoint)
+        self.assertEqual(layout_hash, game.game_map.get_board_hash(), "Rolling back should restore the hash")
+
+        health_hash = game.game_map.get_board_hash(True)
+        game.game_map[13, 10][0].health /= 2
+        game.game_map._update_tile(13, 10)
+        self.assertEqual(layout_hash, game.game_map.get_board_hash())
+        self.assertNotEqual(health_hash, game.game_map.get_board_hash(True), "Health buckets should be part of the health hash")
+
+    def test_bitboards(self):
+        from . import bitboard
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 0])
+        game.game_map.add_unit("DF", [14, 17], 1)
+        game.game_map.add_unit("DF", [13, 14], 1)
+        game.game_map.add_unit("FF", [10, 16], 1)
+
+        self.assertEqual(4, bitboard.count(game.game_map.get_bitboard()))
+        self.assertEqual(bitboard.from_locations([[13, 14], [14, 17]]), game.game_map.get_bitboard(1, "DF"))
+        self.assertEqual([[13, 14]], bitboard.to_locations(game.game_map.get_bitboard(1, "DF") & bitboard.rows([14, 15])))
+        edge = bitboard.from_locations(game.game_map.get_edge_locations(game.game_map.BOTTOM_LEFT))
+        self.assertEqual([[13, 0]], bitboard.to_locations(game.game_map.get_bitboard() & edge), "Blocked edge tiles should be found with one intersection")
+        self.assertTrue(bitboard.contains(game.game_map.get_bitboard(0), [13, 0]))
+        self.assertFalse(bitboard.contains(game.game_map.get_bitboard(0), [-1, 0]))
+
+        game.game_map.remove_unit([13, 0])
+        self.assertEqual(0, game.game_map.get_bitboard(0), "Bitboards should follow changes to the map")
+
+        for location in ([13, 0], [14, 27], [0, 13], [27, 14], [5, 12]):
+            expected = [[x, y] for x, y in game.game_map.get_locations_in_range(location, 1) if [x, y] != location]
+            self.assertEqual(sorted(expected), bitboard.to_locations(bitboard.neighbors(bitboard.from_locations([location]))), "Wrong neighbors of {}".format(location))
+        self.assertEqual(bitboard.ARENA, bitboard.expand(bitboard.from_locations([[13, 0]]), 40))
+
+    def test_binary_encoding(self):
+        import pickle
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        game.game_map.add_unit("DF", [14, 17], 1)
+        game.game_map.add_unit("PI", [13, 0])
+        game.game_map.add_unit("PI", [13, 0])
+        game.attempt_upgrade([13, 10])
+        game.game_map[14, 17][0].health = 12.5
+        game.attempt_spawn("EF", [5, 10])
+
+        data = game.to_bytes()
+        decoded = GameState.from_bytes(data, game.config)
+        self.assertLess(len(data), len(pickle.dumps(game.game_map)) / 10, "The encoding should be much smaller than a pickle")
+        self.assertEqual(game.game_map.get_board_hash(True), decoded.game_map.get_board_hash(True))
+        self.assertEqual([str(unit) for unit in game.game_map[13, 0]], [str(unit) for unit in decoded.game_map[13, 0]])
+        self.assertTrue(decoded.game_map[13, 10][0].upgraded)
+        self.assertEqual(12.5, decoded.game_map[14, 17][0].health)
+        self.assertEqual(game.get_resources(), decoded.get_resources())
+        self.assertEqual(game._build_stack, decoded._build_stack)
+        self.assertEqual(game.turn_number, decoded.turn_number)
+        self.assertIs(game.config, decoded.game_map[13, 10][0].config, "The config should be shared, not copied")
+        self.assertIsNone(GameState.from_bytes(data[:-1], game.config), "Truncated data should be rejected")
+
+    def test_mirrored(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("FF", [13, 10])
+        game.game_map.add_unit("DF", [14, 17], 1)
+        game.game_map.add_unit("FF", [10, 16], 1)
+        game.game_map.add_unit("PI", [13, 27], 1)
+        game.my_health = 20
+        view = game.mirrored()
+
+        turret = view.game_map[14, 10][0]
+        self.assertEqual([14, 10, 0], [turret.x, turret.y, turret.player_index], "Enemy units should appear as ours on the bottom half")
+        self.assertIs(game.game_map[14, 17][0], turret.unit, "Units should not be copied")
+        self.assertEqual(0, view.game_map[13, 0][0].player_index)
+        self.assertEqual(game.game_map.TOP_RIGHT, view.get_target_edge([13, 0]))
+        self.assertEqual([20, 30], [view.enemy_health, view.my_health])
+        self.assertEqual([[14, 10]], [[unit.x, unit.y] for unit in view.get_attackers([14, 12], 1)])
+        self.assertEqual(frozenset([(13, 17), (14, 10), (10, 11)]), view.game_map.get_blocked_locations())
+        self.assertEqual([[14, 10], [10, 11]], [[unit.x, unit.y] for unit in view.game_map.iter_structures(0)])
+
+        expected = {(x, 27 - y): [[px, 27 - py] for px, py in path] for (x, y), path in game.find_paths_from_all_spawns(1).items()}
+        self.assertEqual(expected, view.find_paths_from_all_spawns(0), "Mirrored paths should match the opponent's paths")
+
+        view.game_map.add_unit("EF", [5, 10])
+        self.assertEqual(1, game.game_map[5, 17][0].player_index, "Edits through the view should change the original")
+        self.assertIs(game.game_map, view.mirrored().game_map, "Mirroring twice should give back the original map")
+
+        resources = game.get_resources(1)
+        for action in (lambda: view.attempt_spawn("FF", [3, 12]), lambda: view.attempt_upgrade([14, 10]),
+                       lambda: view.attempt_remove([14, 10]), view.submit_turn):
+            with self.assertRaises(RuntimeError):
+                action()
+        self.assertEqual(resources, game.get_resources(1), "The view should not spend the opponent's resources")
+        self.assertEqual([], game._build_stack)
+        self.assertFalse(game.game_map[14, 17][0].upgraded)
+
+    def test_lazy_parsing(self):
+        config = self.make_turn_0_map().config
+        turn = json.dumps({
+            "p1Units": [[[13, 10, 60.0, "1"]], [], [[3, 12, 75.0, "2"]], [[13, 0, 15.0, "3"], [13, 0, 15.0, "4"]], [], [], [[13, 10, 0, "5"]], [[3, 12, 0, "6"]]],
+            "p2Units": [[], [], [[14, 17, 75.0, "7"]], [[14, 27, 15.0, "8"]], [], [], [], []],
+            "turnInfo": [0, 3, -1], "p1Stats": [25.0, 10.0, 7.0, 0], "p2Stats": [20.0, 12.0, 6.0, 0], "events": {}})
+        eager = GameState(config, turn)
+        lazy = GameState(config, turn, lazy=True)
+        self.assertEqual([3, 20.0, 12.0], [lazy.turn_number, lazy.enemy_health, lazy.get_resource(lazy.SP, 1)])
+
+        structures = lazy.get_structures(0)
+        self.assertIsNotNone(lazy._unparsed_units, "Typed accessors should not fill in the map")
+        self.assertEqual([[13, 10], [3, 12]], [[unit.x, unit.y] for unit in structures])
+        self.assertEqual([True, False], [unit.pending_removal for unit in structures])
+        self.assertEqual([False, True], [unit.upgraded for unit in structures])
+        self.assertEqual(["DF"], [unit.unit_type for unit in lazy.get_structures(1)])
+        self.assertEqual(2, len(lazy.get_mobile_units(0, "PI")))
+
+        self.assertIs(structures[0], lazy.game_map[13, 10][0], "Units parsed by the accessors should be reused by the map")
+        self.assertIsNone(lazy._unparsed_units)
+        for x, y in eager.game_map:
+            self.assertEqual([str(unit) for unit in eager.game_map[x, y]], [str(unit) for unit in lazy.game_map[x, y]])
+        self.assertEqual(eager.game_map.get_board_hash(True), lazy.game_map.get_board_hash(True))
+        for player_index in (0, 1):
+            self.assertEqual([str(unit) for unit in eager.get_mobile_units(player_index)], [str(unit) for unit in lazy.get_mobile_units(player_index)])
+            self.assertEqual([str(unit) for unit in eager.get_structures(player_index)], [str(unit) for unit in lazy.get_structures(player_index)])
+
+    def test_parsed_message(self):
+        from .util import ParsedMessage, decode_message
+        config = self.make_turn_0_map().config
+        turn = """{"p1Units":[[[13,10,60.0,"1"]],[],[],[],[],[],[],[]],"p2Units":[[],[],[],[],[],[],[],[]],"turnInfo":[0,4,-1],"p1Stats":[30.0,25.0,5.0,0],"p2Stats":[30.0,25.0,5.0,0],"events":{}}"""
+        message = ParsedMessage(turn)
+        self.assertEqual(turn, message, "A ParsedMessage should still work as the message string")
+        self.assertIs(message.data, decode_message(message))
+        self.assertIs(message.data, decode_message(message.data))
+        self.assertEqual(message.data, decode_message(turn))
+
+        for state in (GameState(config, turn), GameState(config, message), GameState(config, message.data)):
+            self.assertEqual(4, state.turn_number)
+            self.assertTrue(state.contains_stationary_unit([13, 10]))
+
+    def test_json_codec(self):
+        from .util import set_json_codec, get_json_codec, json_loads, json_dumps, JSON_CODECS
+        from .json_benchmark import record_frames, run_benchmark
+        default_codec = get_json_codec()
+        self.assertEqual(next(iter(JSON_CODECS)), default_codec, "The fastest importable codec should be selected")
+        self.assertFalse(set_json_codec("missing_codec"))
+        self.assertEqual(default_codec, get_json_codec())
+        try:
+            for name in JSON_CODECS:
+                self.assertTrue(set_json_codec(name))
+                encoded = json_dumps([["FF", 13, 10], {"SP": 1.5}])
+                self.assertIsInstance(encoded, str)
+                self.assertEqual([["FF", 13, 10], {"SP": 1.5}], json_loads(encoded))
+        finally:
+            set_json_codec()
+
+        frames = record_frames(self.make_turn_0_map().config, frames=3)
+        self.assertEqual(1, json.loads(frames[0])["turnInfo"][0])
+        self.assertEqual(set(JSON_CODECS), set(run_benchmark(frames, repeat=1)))
+
+    def test_update_from(self):
+        config = self.make_turn_0_map().config
+        def turn(p1_units, p2_units, turn_number):
+            return json.dumps({"p1Units": p1_units, "p2Units": p2_units, "turnInfo": [0, turn_number, -1],
+                "p1Stats": [30.0, 10.0, 5.0, 0], "p2Stats": [30.0, 10.0, 5.0, 0], "events": {}})
+        first = GameState(config, turn(
+            [[[13, 10, 60.0, "1"]], [], [[3, 12, 75.0, "2"]], [], [], [], [], []],
+            [[[10, 16, 60.0, "3"]], [], [[14, 17, 75.0, "4"]], [], [], [], [], []], 1))
+        wall = first.game_map[13, 10][0]
+        turret = first.game_map[3, 12][0]
+        second_turn = turn(
+            [[[13, 10, 40.0, "1"]], [[5, 10, 30.0, "5"]], [[3, 12, 75.0, "2"]], [[13, 0, 15.0, "6"]], [], [], [[13, 10, 0, "1"]], [[3, 12, 0, "2"]]],
+            [[], [], [[10, 16, 75.0, "7"]], [], [], [], [], []], 2)
+        second = GameState.update_from(first, second_turn)
+
+        self.assertIs(wall, second.game_map[13, 10][0], "Unchanged structures should be reused")
+        self.assertIs(turret, second.game_map[3, 12][0])
+        self.assertEqual([40.0, True], [wall.health, wall.pending_removal])
+        changes = second.change_set
+        self.assertEqual([[5, 10], [10, 16]], [[unit.x, unit.y] for unit in changes["added"]])
+        self.assertEqual([[10, 16], [14, 17]], [[unit.x, unit.y] for unit in changes["removed"]], "A structure replaced by another type should be removed and added")
+        self.assertEqual([wall], changes["damaged"])
+        self.assertEqual([turret], changes["upgraded"])
+
+        fresh = GameState(config, second_turn)
+        for x, y in fresh.game_map:
+            self.assertEqual([str(unit) for unit in fresh.game_map[x, y]], [str(unit) for unit in second.game_map[x, y]])
+        self.assertEqual(fresh.game_map.get_board_hash(True), second.game_map.get_board_hash(True))
+        self.assertEqual(turret.cost, fresh.game_map[3, 12][0].cost)
+
+        third = GameState.update_from(second, turn([[], [], [[3, 12, 75.0, "8"]], [], [], [], [], []], [[], [], [], [], [], [], [], []], 3))
+        self.assertIsNot(turret, third.game_map[3, 12][0], "An upgraded structure that is no longer upgraded must have been rebuilt")
+        self.assertFalse(third.game_map[3, 12][0].upgraded)
+        self.assertEqual([turret], [unit for unit in third.change_set["removed"] if unit.x == 3])
+
+    def test_unit_specs(self):
+        from .unit import compile_unit_specs
+        game = self.make_turn_0_map()
+        specs = compile_unit_specs(game.config)
+        self.assertIs(specs, compile_unit_specs(game.config), "Each config should only be compiled once")
+        turret_info = game.config["unitInformation"][2]
+        base, upgraded = specs["DF"]
+        self.assertEqual([turret_info["attackRange"], turret_info["upgrade"]["attackRange"]], [base.attackRange, upgraded.attackRange])
+        self.assertEqual((turret_info["cost1"] + turret_info["upgrade"]["cost1"], 0), upgraded.cost)
+
+        game.game_map.add_unit("DF", [13, 10])
+        game.game_map.add_unit("DF", [14, 10])
+        first, second = game.game_map[13, 10][0], game.game_map[14, 10][0]
+        self.assertIs(first.spec, second.spec, "Units of the same type should share a spec")
+        self.assertEqual([base.max_health, False], [first.health, first.upgraded])
+        first.upgrade()
+        self.assertIs(upgraded, first.spec)
+        self.assertEqual([upgraded.attackRange, list(upgraded.cost), True], [first.attackRange, first.cost, first.upgraded])
+        self.assertEqual(base.attackRange, second.attackRange, "Upgrading should not change other units")
@@ -1,3 +1,6 @@
+from collections import namedtuple
+
+
 def is_stationary(unit_type, structure_types):
     """
         Args:
@@ -9,6 +12,69 @@ def is_stationary(unit_type, structure_types):
     return unit_type in structure_types
 
 
+class UnitSpec(namedtuple("UnitSpec", ["unit_type", "stationary", "speed", "damage_f", "damage_i", "attackRange",
+                                       "shieldRange", "max_health", "shieldPerUnit", "cost", "upgraded"])):
+    """The stats of a unit type, before or after upgrading. Specs are immutable, and every unit of a type shares them.
+    The attributes match those of GameUnit, except that cost is a tuple. See compile_unit_specs.
+    """
+    __slots__ = ()
+
+
+# Compiled specs by id of the config, along with the config so that a reused id is not mistaken for it
+_UNIT_SPECS = {}
+_MAX_CACHED_CONFIGS = 16
+
+
+def compile_unit_specs(config):
+    """Compiles the unit information of a config into UnitSpecs.
+    Each config is only compiled once, later calls with the same config object return the same specs.
+    AlgoCore compiles the config when the game starts, so creating units never has to read the config.
+
+    Args:
+        config: A json object containing information about the game. It should not be changed after it is compiled
+
+    Returns:
+        A dict mapping each unit type to a pair of UnitSpecs, the stats of the type before and after upgrading
+
+    """
+    cached = _UNIT_SPECS.get(id(config))
+    if cached is not None and cached[0] is config:
+        return cached[1]
+    specs = {}
+    for type_config in config["unitInformation"]:
+        unit_type = type_config.get("shorthand")
+        base = UnitSpec(
+            unit_type,
+            type_config.get("unitCategory") == 0,
+            type_config.get("speed", 0),
+            type_config.get("attackDamageTower", 0),
+            type_config.get("attackDamageWalker", 0),
+            type_config.get("attackRange", 0),
+            type_config.get("shieldRange", 0),
+            type_config.get("startHealth", 0),
+            type_config.get("shieldPerUnit", 0),
+            (type_config.get("cost1", 0), type_config.get("cost2", 0)),
+            False)
+        upgrade_config = type_config.get("upgrade", {})
+        upgraded = UnitSpec(
+            unit_type,
+            base.stationary,
+            upgrade_config.get("speed", base.speed),
+            upgrade_config.get("attackDamageTower", base.damage_f),
+            upgrade_config.get("attackDamageWalker", base.damage_i),
+            upgrade_config.get("attackRange", base.attackRange),
+            upgrade_config.get("shieldRange", base.shieldRange),
+            upgrade_config.get("startHealth", base.max_health),
+            upgrade_config.get("shieldPerUnit", base.shieldPerUnit),
+            (upgrade_config.get("cost1", 0) + base.cost[0], upgrade_config.get("cost2", 0) + base.cost[1]),
+            True)
+        specs[unit_type] = (base, upgraded)
+    if len(_UNIT_SPECS) >= _MAX_CACHED_CONFIGS:
+        _UNIT_SPECS.clear()
+    _UNIT_SPECS[id(config)] = (config, specs)
+    return specs
+
+
 class GameUnit:
     """Holds information about a Unit. 
 
@@ -30,6 +96,7 @@ class GameUnit:
         * shieldPerUnit (float): how much shield is given per unit
         * pending_removal (boolean): If this unit is marked for removal by its owner
         * upgraded (boolean): If this unit is upgraded
+        * spec (:obj: UnitSpec): The stats of this unit's type, which the stats above are read from
 
     """
     def __init__(self, unit_type, config, player_index=None, health=None, x=-1, y=-1):
@@ -40,38 +107,53 @@ class GameUnit:
         self.config = config
         self.player_index = player_index
         self.pending_removal = False
-        self.upgraded = False
         self.x = x
         self.y = y
-        self.__serialize_type()
-        self.health = self.max_health if not health else health
-
-    def __serialize_type(self):
-        from .game_state import STRUCTURE_TYPES, UNIT_TYPE_TO_INDEX, SUPPORT
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]]
-        self.stationary = type_config["unitCategory"] == 0
-        self.speed = type_config.get("speed", 0)
-        self.damage_f = type_config.get("attackDamageTower", 0)
-        self.damage_i = type_config.get("attackDamageWalker", 0)
-        self.attackRange = type_config.get("attackRange", 0)
-        self.shieldRange = type_config.get("shieldRange", 0)
-        self.max_health = type_config.get("startHealth", 0)
-        self.shieldPerUnit = type_config.get("shieldPerUnit", 0)
-        self.cost = [type_config.get("cost1", 0), type_config.get("cost2", 0)]
+        self.spec = compile_unit_specs(config)[unit_type][0]
+        self.health = self.spec.max_health if not health else health
+
+    @property
+    def stationary(self):
+        return self.spec.stationary
+
+    @property
+    def speed(self):
+        return self.spec.speed
+
+    @property
+    def damage_f(self):
+        return self.spec.damage_f
+
+    @property
+    def damage_i(self):
+        return self.spec.damage_i
+
+    @property
+    def attackRange(self):
+        return self.spec.attackRange
+
+    @property
+    def shieldRange(self):
+        return self.spec.shieldRange
+
+    @property
+    def max_health(self):
+        return self.spec.max_health
+
+    @property
+    def shieldPerUnit(self):
+        return self.spec.shieldPerUnit
+
+    @property
+    def cost(self):
+        return list(self.spec.cost)
 
+    @property
+    def upgraded(self):
+        return self.spec.upgraded
 
     def upgrade(self):
-        from .game_state import UNIT_TYPE_TO_INDEX
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]].get("upgrade", {})
-        self.speed = type_config.get("speed", self.speed)
-        self.damage_f = type_config.get("attackDamageTower", self.damage_f)
-        self.damage_i = type_config.get("attackDamageWalker", self.damage_i)
-        self.attackRange = type_config.get("attackRange", self.attackRange)
-        self.shieldRange = type_config.get("shieldRange", self.shieldRange)
-        self.max_health = type_config.get("startHealth", self.max_health)
-        self.shieldPerUnit = type_config.get("shieldPerUnit", self.shieldPerUnit)
-        self.cost = [type_config.get("cost1", 0) + self.cost[0], type_config.get("cost2", 0) + self.cost[1]]
-        self.upgraded = True
+        self.spec = compile_unit_specs(self.config)[self.unit_type][1]
 
 
     def __toString(self):
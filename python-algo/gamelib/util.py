@@ -1,9 +1,104 @@
+import json
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 
 BANNER_TEXT = "---------------- Starting Your Algo --------------------"
 
 
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# The json codecs that can be imported, as (loads, dumps) pairs, from the fastest to the standard library.
+# dumps always returns a str. Each codec decodes to the same dicts and lists, but encoded strings may differ in spacing
+JSON_CODECS = {}
+if orjson is not None:
+    JSON_CODECS["orjson"] = (orjson.loads, _orjson_dumps)
+if ujson is not None:
+    JSON_CODECS["ujson"] = (ujson.loads, ujson.dumps)
+JSON_CODECS["json"] = (json.loads, json.dumps)
+
+_json_codec = next(iter(JSON_CODECS))
+_json_loads, _json_dumps = JSON_CODECS[_json_codec]
+
+
+def set_json_codec(name=None):
+    """Selects the json codec used by gamelib to decode engine messages and encode turns.
+    The fastest importable codec is selected when gamelib is imported.
+
+    Args:
+        name: "orjson", "ujson" or "json" for the standard library. If None, the fastest importable codec is selected
+
+    Returns:
+        True if the codec was selected, False if it can't be imported
+
+    """
+    global _json_codec, _json_loads, _json_dumps
+    if name is None:
+        name = next(iter(JSON_CODECS))
+    if name not in JSON_CODECS:
+        debug_write("Json codec {} is not available, still using {}".format(name, _json_codec))
+        return False
+    _json_codec = name
+    _json_loads, _json_dumps = JSON_CODECS[name]
+    return True
+
+def get_json_codec():
+    """Gets the name of the json codec in use, see set_json_codec
+    """
+    return _json_codec
+
+def json_loads(data):
+    """Decodes a json string with the selected codec
+    """
+    return _json_loads(data)
+
+def json_dumps(obj):
+    """Encodes an object as a json string with the selected codec
+    """
+    return _json_dumps(obj)
+
+
+class ParsedMessage(str):
+    """A message from the game engine, along with its decoded json.
+    It is a str, so it can be used anywhere the raw message string is expected, but decode_message
+    and GameState read the decoded json from it instead of decoding the string again.
+
+    Attributes :
+        * data (dict): The decoded json of the message
+
+    """
+    def __new__(cls, message, data=None):
+        parsed = super().__new__(cls, message)
+        parsed.data = json_loads(message) if data is None else data
+        return parsed
+
+
+def decode_message(message):
+    """Gets the decoded json of a message from the game engine, only decoding it if needed
+
+    Args:
+        message: A message string, a ParsedMessage or an already decoded dict
+
+    Returns:
+        The decoded json of the message. The data of a ParsedMessage is returned as is, not copied
+
+    """
+    if isinstance(message, ParsedMessage):
+        return message.data
+    if isinstance(message, dict):
+        return message
+    return json_loads(message)
+
 def get_command():
     """Gets input from stdin
 